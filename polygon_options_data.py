@@ -1,14 +1,39 @@
+import hashlib
+import heapq
 import json
+import logging
 import os
-import random
+import sys
+import threading
 import time
+import traceback
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, wraps
 from datetime import datetime, timedelta
+from itertools import chain
+from operator import itemgetter
 from typing import List, Dict, Optional, Union, Tuple
 from trade_simulator import simulate_recommended_trades
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # Chain scoring falls back to plain NumPy
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Responses are decoded with requests' stdlib json instead
+
+# Per-contract diagnostics go to DEBUG so they cost nothing unless enabled
+logger = logging.getLogger(__name__)
+
 # Configuration
 # Get API key from environment variable or use placeholder
 import os
@@ -31,6 +56,38 @@ TICKERS = [
     "XOM", "PEP", "JNJ", "BA", "GE", "ABNB"
 ]  # 18 high-liquidity tickers
 
+# Lifetimes (seconds) of memoized API lookups; see ttl_cache and FileCache
+PRICE_CACHE_TTL = 15 * 60  # Previous close, stable intraday
+EXPIRATIONS_CACHE_TTL = 3600
+CHAIN_CACHE_TTL = 6 * 3600  # Contract lists for a fixed expiration
+MARKET_STATUS_CACHE_TTL = 60  # In memory only; the status flips at the open and close
+CACHE_DIR = os.path.join('.cache', 'polygon')
+
+# Connections kept open per host by the shared HTTP session
+HTTP_POOL_SIZE = 32
+
+# Sustained Polygon requests per second across all threads; see RateLimiter.
+# Raise it for paid plans with POLYGON_RATE_LIMIT or --rate-limit
+API_RATE_LIMIT = float(os.environ.get('POLYGON_RATE_LIMIT', 5))
+
+# Resends of a 429 by _track_rate_limit, each paced through rate_limiter
+RATE_LIMIT_RETRIES = 3
+
+# Safety cap on next_url pages followed per options chain (1000 contracts each)
+MAX_CHAIN_PAGES = 10
+
+# Console banner rule around run() and per-ticker output
+BANNER_BAR = '=' * 80
+RUN_COMPLETE_BANNER = "\n{bar}\n✅ Analysis complete!\n📄 Report saved to: {report}\n{trade_sheet}{bar}\n"
+TRADE_SHEET_SAVED_LINE = "📊 Trade ideas saved to: {}\n"
+
+# Write buffer for the streamed markdown reports
+REPORT_BUFFER_SIZE = 1 << 20
+REPORT_FSYNC = False  # fsync each finished report so it survives a crash (--durable)
+
+# Number of tickers scanned concurrently by run()
+MAX_SCAN_WORKERS = 8
+
 # Options expiration date (YYYY-MM-DD) - using June 2025 expiration
 TARGET_EXPIRATION = "2025-06-20"  # Third Friday of June 2025
 
@@ -68,6 +125,114 @@ CALL_MAX_DELTA = 0.35  # 35 delta calls
 MIN_OPEN_INTEREST = 100  # Minimum open interest
 MIN_VOLUME = 50  # Minimum daily volume
 
+# Row layout used by chain_to_array for vectorized filtering
+OPTION_DTYPE = np.dtype([
+    ('strike', 'f8'), ('delta', 'f8'), ('mid', 'f8'), ('bid', 'f8'), ('ask', 'f8'),
+    ('last', 'f8'), ('oi', 'f8'), ('vol', 'f8'), ('dte', 'i8')
+])
+
+# Trade ranking
+TRADE_RANK_METRIC = 'annualized_yield'  # Metric used to rank filtered trades
+# Option field behind each TRADE_RANK_METRIC choice (higher is better)
+RANK_METRIC_FIELDS = {
+    'annualized_yield': 'annualized_yield',
+    'annualized_roc': 'annualized_roc',
+    'premium_per_day': 'premium_per_day',
+    'risk_reward': 'risk_reward_ratio',
+    'probability_itm': 'probability_itm'
+}
+
+MAX_TRADES_PER_TYPE = 10  # Number of trades kept per option type
+# Sort keys for filtered options, which always carry both fields
+BY_STRIKE = itemgetter('strike_price')
+BY_ANNUALIZED_YIELD = itemgetter('annualized_yield')
+REPORT_TOP_TRADES = 10  # Top opportunities listed in the run() report
+CONSOLE_TOP_TRADES = 3  # Of those, how many are echoed to the console
+TRADE_SHEET_TOP_TRADES = 10  # Trades per type ranked into the trade idea sheet
+
+# Risk-tolerance filter parameters for filter_and_sort_options; the delta
+# bands differ between puts and calls, everything else is shared.
+RISK_PARAMS_PUT = {
+    'low': {
+        'pop_min': 0.75,
+        'delta_min': 0.30,
+        'delta_max': 0.70,
+        'min_premium_mod': 1.5,  # Higher premium for lower risk
+        'spread_max': 0.15,  # Max bid-ask spread as a fraction of mid; tighter spreads
+        'tag': '💰 Income'
+    },
+    'medium': {
+        'pop_min': 0.50,
+        'delta_min': 0.15,
+        'delta_max': 0.85,
+        'min_premium_mod': 1.0,
+        'spread_max': 0.30,
+        'tag': '📈 Directional'
+    },
+    'high': {
+        'pop_min': 0.30,
+        'delta_min': 0.05,
+        'delta_max': 0.95,
+        'min_premium_mod': 0.5,  # Accept lower premiums
+        'spread_max': 0.50,  # Wider spreads allowed
+        'tag': '🎯 Speculative'
+    }
+}
+
+RISK_PARAMS_CALL = {
+    'low': {**RISK_PARAMS_PUT['low'], 'delta_min': 0.15, 'delta_max': 0.50},
+    'medium': {**RISK_PARAMS_PUT['medium'], 'delta_min': 0.05, 'delta_max': 0.70},
+    'high': {**RISK_PARAMS_PUT['high'], 'delta_min': 0.01, 'delta_max': 0.90}
+}
+
+# Contract fields get_options_chain keeps from Polygon's payload
+CHAIN_FIELDS = frozenset((
+    'ticker', 'contract_type', 'strike_price', 'expiration_date', 'greeks',
+    'delta', 'gamma', 'theta', 'vega', 'implied_volatility', 'open_interest', 'volume',
+    'bid', 'ask', 'mid_price', 'last_trade_price', 'last_quote', 'day', 'details'
+))
+
+# Fields an option must carry to be considered by filter_and_sort_options
+REQUIRED_OPTION_FIELDS = frozenset((
+    'strike_price', 'delta', 'mid_price', 'days_to_expiration',
+    'bid', 'ask', 'open_interest', 'volume'
+))
+
+# Per-ticker option tables in the run() report
+OPTION_TABLE_HEADER = (
+    "| Strike | Premium | Δ | Yield | Annualized | ROC | DTE | Prob ITM | R/R | OI | Volume |",
+    "|--------|---------|--|-------|------------|-----|-----|----------|-----|----|--------|"
+)
+OPTION_TABLE_KEYS = (
+    'strike_price', 'mid_price', 'delta', 'premium_yield', 'annualized_yield', 'monthly_roc',
+    'days_to_expiration', 'probability_itm', 'risk_reward_ratio', 'open_interest', 'volume'
+)
+OPTION_TABLE_FIELDS = itemgetter(*OPTION_TABLE_KEYS)
+OPTION_TABLE_DEFAULTS = dict.fromkeys(OPTION_TABLE_KEYS, 0)
+OPTION_TABLE_ROW = ("| ${:.2f} | ${:.2f} | {:.2f} | {:.1f}% | {:.1f}% | {:.1f}% | {} | "
+                    "{:.1f}% | 1:{:.1f} | {:,} | {:,} |")
+
+# run() console top-3 line and report top-opportunity row; rendered with
+# format_map over a ZeroDefaultDict so missing metrics show as 0
+TOP_TRADE_LINE = ("   {idx}. {ticker} ${strike_price:.2f} {kind} | Premium: ${mid_price:.2f} | "
+                  "Yield: {annualized_yield:.1f}% | Δ {delta:.2f} | DTE: {days_to_expiration}")
+TOP_OPPORTUNITY_ROW = ("| {ticker} | ${strike_price:.2f} | ${mid_price:.2f} | {annualized_yield:.1f}% | "
+                       "{days_to_expiration} | {delta:.2f} | {probability_itm:.0f}% | {play_type} |")
+TOP_OPPORTUNITY_DEFAULTS = {'play_type': 'N/A'}
+
+# Closing lines of the run() report
+REPORT_FOOTER = "\n---\nGenerated on {generated:%Y-%m-%d at %H:%M:%S %Z}\n"
+
+# Trade idea sheet put/call tables; rows are rendered by format_trade_sheet_rows
+TRADE_SHEET_TABLE_HEADER = (
+    "| Ticker | Price | Strike | Premium | Yield | Annualized | DTE | Δ | POP% | Sim P/L% | Max DD% | Tags |",
+    "|--------|-------|--------|---------|-------|------------|-----|---|------|----------|---------|------|"
+)
+TRADE_SHEET_ROW = ("| {ticker} | ${underlying_price:.2f} | ${strike_price:.2f} | ${mid_price:.2f} | "
+                   "{premium_yield:.1f}% | {annualized_yield:.1f}% | {days_to_expiration} | {delta:.2f} | "
+                   "{probability_of_profit:.1f}% | {realized_yield:.1f}% | {max_drawdown:.1f}% | {tags} |")
+TRADE_SHEET_DEFAULTS = {'ticker': 'N/A'}
+
 # Output formatting
 PRICE_WIDTH = 8
 STRIKE_WIDTH = 10
@@ -79,14 +244,312 @@ OUTPUT_FILE = 'options_analysis.md'  # Output markdown file
 # Strike price range for options chain (as a percentage of current price)
 STRIKE_PRICE_RANGE = 0.30  # 30% range around current price
 
+# Detail block for the "Top Trade Recommendations" section of the trade sheet.
+# Rendered with str.format_map so missing numeric fields fall back to 0.
+TRADE_DETAIL_TEMPLATE = (
+    "### {idx}. {ticker} - ${strike_price:.2f} {kind}\n"
+    "```\n"
+    "Entry:       ${underlying_price:.2f}\n"
+    "Strike:      ${strike_price:.2f} ({strike_pct_otm:.1f}% OTM)\n"
+    "Premium:     ${mid_price:.2f} (${bid:.2f} / ${ask:.2f})\n"
+    "Yield:       {premium_yield:.1f}% ({annualized_yield:.1f}% annualized)\n"
+    "Expiration:  {expiration} (in {days_to_expiration} days)\n"
+    "Delta:       {delta:.2f} | Gamma: {gamma:.4f}\n"
+    "Theta:       ${theta:.2f}/day | Vega: ${vega:.2f}\n"
+    "Open Int:    {open_interest:,} | Volume: {volume:,}\n"
+    "\n📊 Simulation Results:\n"
+    "- Expected P/L:   {sim[realized_yield]:.1f}%\n"
+    "- Max Drawdown:   {sim_max_drawdown:.1f}%\n"
+    "- Prob. Profit:   {sim[probability_of_profit]:.1f}%\n"
+    "- Breakeven:      ${sim[breakeven]:.2f}\n"
+    "- Expected Exit:  ${sim[exit_price]:.2f} in {sim[held_days]} days\n"
+    "```\n"
+    "**Trade Rationale:** [Brief analysis of why this is a good trade]"
+)
+
+class ZeroDefaultDict(dict):
+    """Dict whose missing keys resolve to 0, for use with str.format_map."""
+    def __missing__(self, key):
+        return 0
+
+def _trade_detail_context(opt, idx, kind):
+    """Build the format_map context for TRADE_DETAIL_TEMPLATE."""
+    sim = ZeroDefaultDict(opt.get('simulation') or {})
+    ctx = ZeroDefaultDict(opt)
+    ctx.setdefault('ticker', 'N/A')
+    ctx.setdefault('expiration', 'N/A')
+    ctx.update(idx=idx, kind=kind, sim=sim, sim_max_drawdown=abs(sim['max_drawdown']))
+    return ctx
+
+def _emit_top_trade(opt, idx, kind, writer):
+    """Render one 'Top Trade Recommendations' block for a put or call via writer."""
+    writer(TRADE_DETAIL_TEMPLATE.format_map(_trade_detail_context(opt, idx, kind)))
+    writer('\n')
+
+def _dumps(obj) -> bytes:
+    """Serialize obj to JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode('utf-8')
+
+def _loads(data: bytes):
+    """Parse JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FileCache:
+    """
+    JSON-file cache for API results, one file per key under a directory.
+    
+    Each file stores {'ts': <epoch seconds>, 'data': <value>}; the TTL is
+    chosen by the reader so each endpoint can keep its own freshness window.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+    
+    def _path(self, key) -> str:
+        digest = hashlib.md5(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+    
+    def get(self, key, ttl: float):
+        """Return the cached value for key if younger than ttl seconds, else None."""
+        entry = self._entry(key, ttl)
+        return entry['data'] if entry is not None else None
+    
+    def _entry(self, key, ttl: float) -> Optional[dict]:
+        """Return the fresh {'ts', 'data'} entry for key, or None on a miss.
+        
+        Expired entries are deleted on read so the directory does not grow
+        with stale chains across runs. Files that do not hold a well-formed
+        entry (hand-edited, written by another version) count as misses.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = _loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(entry, dict) or 'data' not in entry
+                or not isinstance(entry.get('ts'), (int, float))):
+            return None
+        if time.time() - entry['ts'] >= ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Another thread may have replaced or removed it already
+            return None
+        return entry
+    
+    def set(self, key, value):
+        """Store value under key; the write is atomic so readers never see partial files."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps({'ts': time.time(), 'data': value}))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️  Could not write cache entry: {e}")
+
+file_cache = FileCache(CACHE_DIR)
+
+def ttl_cache(maxsize: int = 128, ttl_seconds: float = 60, key=None, cacheable=bool,
+              persist: bool = False, bypass=None):
+    """
+    Memoize a function's results for ttl_seconds.
+    
+    Entries live in a per-function dict of (value, expiry) pairs checked
+    against time.monotonic(). With persist=True they are also written to
+    file_cache so a rerun within the TTL window skips the API.
+    
+    Args:
+        maxsize: Maximum number of in-memory entries; expired entries are
+            dropped first, then the oldest one
+        ttl_seconds: Lifetime of a cached result in seconds
+        key: Optional callable mapping the call arguments to a cache key;
+            defaults to the positional arguments
+        cacheable: Predicate deciding whether a result is stored; failed
+            lookups (None, empty lists) are retried on the next call
+        persist: Also store results on disk through file_cache; disk hits
+            are promoted into memory for the rest of their lifetime
+        bypass: Optional zero-argument predicate; while it returns True the
+            function is called directly and nothing is read from or stored in
+            either cache
+    """
+    def decorator(func):
+        entries = {}
+        lock = threading.Lock()
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if bypass is not None and bypass():
+                return func(*args, **kwargs)
+            cache_key = key(*args, **kwargs) if key else args
+            file_key = (func.__name__, cache_key)
+            now = time.monotonic()
+            with lock:
+                hit = entries.get(cache_key)
+                if hit is not None and now < hit[1]:
+                    return hit[0]
+                entries.pop(cache_key, None)
+            if persist:
+                entry = file_cache._entry(file_key, ttl_seconds)
+                if entry is not None and entry['data'] is not None:
+                    # Keep the disk entry's remaining lifetime rather than restarting it
+                    remaining = ttl_seconds - (time.time() - entry['ts'])
+                    store(cache_key, entry['data'], remaining)
+                    return entry['data']
+            
+            value = func(*args, **kwargs)
+            if not cacheable(value):
+                return value
+            
+            store(cache_key, value, ttl_seconds)
+            if persist:
+                file_cache.set(file_key, value)
+            return value
+        
+        def store(cache_key, value, lifetime):
+            with lock:
+                if len(entries) >= maxsize:
+                    now = time.monotonic()
+                    for stale in [k for k, (_, expiry) in entries.items() if expiry <= now]:
+                        del entries[stale]
+                    if len(entries) >= maxsize:
+                        del entries[next(iter(entries))]
+                entries[cache_key] = (value, time.monotonic() + lifetime)
+        
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
+
+def _build_session() -> requests.Session:
+    """Create the pooled session shared by every Polygon request."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.headers['User-Agent'] = 'BenOptionsScanner/1.0'
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        # 429s are left to _track_rate_limit so their retries share rate_limiter
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1.0,
+            status_forcelist=[502, 503, 504],
+            respect_retry_after_header=True
+        )
+    )
+    session.mount('https://', adapter)
+    session.hooks['response'].append(_track_rate_limit)
+    return session
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every Polygon request.
+    
+    Callers only block when the bucket is empty, so bursts up to the bucket
+    size go out immediately and sustained traffic is held to rps.
+    """
+    
+    def __init__(self, rps: float, burst: Optional[float] = None):
+        self.rps = rps
+        self.capacity = burst if burst is not None else rps
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rps)
+        self.last_refill = now
+    
+    def acquire(self):
+        """Take one token, sleeping until it is available if the bucket is empty."""
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = (1 - self.tokens) / self.rps if self.tokens < 1 else 0.0
+            # Going negative reserves the slot, so concurrent callers queue up
+            self.tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Hold off every caller for seconds, e.g. after a 429 Retry-After."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 1 - seconds * self.rps)
+    
+    def update_from_headers(self, headers):
+        """
+        Shrink the bucket to the budget Polygon reports as remaining.
+        
+        Reads X-RateLimit-Requests-Remaining (or X-RateLimit-Remaining), so
+        workers slow down before the server starts answering with 429s.
+        Responses without the header leave the bucket unchanged.
+        """
+        remaining = headers.get('X-RateLimit-Requests-Remaining', headers.get('X-RateLimit-Remaining'))
+        try:
+            remaining = float(remaining)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+
+rate_limiter = RateLimiter(API_RATE_LIMIT)
+
+def _track_rate_limit(response, *args, **kwargs):
+    """
+    Session response hook feeding every Polygon response back into rate_limiter.
+    
+    A 429 pauses the shared limiter for Retry-After, which holds off every
+    worker, then the request is resent through the limiter up to
+    RATE_LIMIT_RETRIES times. The last response is returned either way, so
+    a persistent 429 still surfaces through raise_for_status().
+    """
+    rate_limiter.update_from_headers(response.headers)
+    for _ in range(RATE_LIMIT_RETRIES):
+        if response.status_code != 429:
+            break
+        try:
+            rate_limiter.pause(float(response.headers.get('Retry-After', 1)))
+        except ValueError:
+            rate_limiter.pause(1)
+        rate_limiter.acquire()
+        response.close()  # Hand the connection back to the pool before resending
+        response = response.connection.send(response.request, **kwargs)
+        rate_limiter.update_from_headers(response.headers)
+    return response
+
+# Keep-alive connections are reused across calls and worker threads
+_SESSION = _build_session()
+
+def parse_json(response: requests.Response):
+    """
+    Decode a Polygon response body, using orjson when it is installed.
+    
+    Decode errors are raised as ValueError subclasses either way, so callers'
+    existing error handling applies unchanged.
+    """
+    return _loads(response.content)
+
+@lru_cache(maxsize=1024)
+def _parse_ymd(date_str: str) -> date:
+    """Parse a YYYY-MM-DD string to a date, memoized since expirations repeat across tickers."""
+    return date.fromisoformat(date_str)
+
+@ttl_cache(maxsize=1, ttl_seconds=MARKET_STATUS_CACHE_TTL)
 def get_market_status():
     """Check if the market is currently open"""
     try:
         url = f"{BASE_URL}/v1/marketstatus/now"
         params = {'apiKey': API_KEY}
-        response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        rate_limiter.acquire()
+        response = _SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = parse_json(response)
         return data.get('market')
     except requests.exceptions.HTTPError as e:
         status_code = e.response.status_code if hasattr(e, 'response') else 'unknown'
@@ -105,6 +568,7 @@ def get_market_status():
         print(f"Unexpected error checking market status: {str(e)}")
         return None
 
+@ttl_cache(ttl_seconds=PRICE_CACHE_TTL, persist=True)
 def get_stock_price(ticker):
     """
     Get the latest stock price for a given ticker.
@@ -127,9 +591,10 @@ def get_stock_price(ticker):
         }
         
         # Set a reasonable timeout
-        response = requests.get(url, params=params, headers=HEADERS, timeout=15)
+        rate_limiter.acquire()
+        response = _SESSION.get(url, params=params, timeout=15)
         response.raise_for_status()
-        data = response.json()
+        data = parse_json(response)
         
         if 'results' in data and data['results'] and 'c' in data['results'][0]:
             price = float(data['results'][0]['c'])
@@ -141,9 +606,10 @@ def get_stock_price(ticker):
         snapshot_url = f"{BASE_URL}/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}"
         snapshot_params = {'apiKey': API_KEY}
         
-        snapshot_response = requests.get(snapshot_url, params=snapshot_params, headers=HEADERS, timeout=15)
+        rate_limiter.acquire()
+        snapshot_response = _SESSION.get(snapshot_url, params=snapshot_params, timeout=15)
         snapshot_response.raise_for_status()
-        snapshot_data = snapshot_response.json()
+        snapshot_data = parse_json(snapshot_response)
         
         # Try different possible locations of the price in the response
         price = None
@@ -195,16 +661,66 @@ def get_stock_price(ticker):
         print(f"Unexpected error getting price for {ticker}: {str(e)}")
         return None
 
-def get_options_chain(ticker, option_type, current_price, max_retries=5, initial_delay=2):
+def get_stock_prices_batch(tickers: List[str]) -> Dict[str, float]:
+    """
+    Get the latest prices for many tickers with one snapshot request.
+    
+    Uses today's close when the session has traded and the previous day's
+    close otherwise. Tickers missing from the response are left out, so
+    callers can fall back to get_stock_price for them.
+    
+    Args:
+        tickers: Stock ticker symbols
+        
+    Returns:
+        Dict mapping ticker to price (empty on any request failure)
+    """
+    if not tickers:
+        return {}
+    
+    url = f"{BASE_URL}/v2/snapshot/locale/us/markets/stocks/tickers"
+    params = {'tickers': ','.join(tickers), 'apiKey': API_KEY}
+    try:
+        rate_limiter.acquire()
+        response = _SESSION.get(url, params=params, timeout=15)
+        response.raise_for_status()
+        data = parse_json(response)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"⚠️  Batch price snapshot failed, falling back to per-ticker prices: {e}")
+        return {}
+    
+    prices = {}
+    for snapshot in data.get('tickers') or ():
+        # 'day' is all zeros before the open, so fall back to the previous close
+        price = (snapshot.get('day') or {}).get('c') or (snapshot.get('prevDay') or {}).get('c')
+        if snapshot.get('ticker') and price:
+            prices[snapshot['ticker']] = float(price)
+    print(f"💵 Fetched {len(prices)}/{len(tickers)} prices in one snapshot request")
+    return prices
+
+@ttl_cache(ttl_seconds=CHAIN_CACHE_TTL,
+           key=lambda ticker, option_type, current_price, expiration=None: (
+               ticker, option_type, current_price, expiration or TARGET_EXPIRATION,
+               date.today().isoformat()),
+           cacheable=lambda chain_data: bool(chain_data and chain_data.get('results')),
+           persist=True,
+           bypass=lambda: get_market_status() == 'open')
+def get_options_chain(ticker, option_type, current_price, expiration=None):
     """
-    Get options chain for a given ticker and option type with enhanced error handling and retries.
+    Get options chain for a given ticker and option type.
+    
+    Every page is fetched by following Polygon's next_url cursor, so chains
+    longer than one 1000-contract page are not truncated. Retries are
+    handled by the shared session, see _build_session. While the market is
+    closed, non-empty chains are cached in memory and on disk for
+    CHAIN_CACHE_TTL per (ticker, type, price, expiration, day); during
+    trading hours quotes move, so every call goes to the API.
     
     Args:
         ticker (str): Stock ticker symbol
         option_type (str): 'put' or 'call'
         current_price (float): Current stock price
-        max_retries (int): Maximum number of retry attempts
-        initial_delay (int): Initial delay between retries in seconds
+        expiration (str): Expiration date (YYYY-MM-DD); defaults to TARGET_EXPIRATION
         
     Returns:
         dict: Dictionary containing options data or empty dict on failure
@@ -241,7 +757,7 @@ def get_options_chain(ticker, option_type, current_price, max_retries=5, initial
     params = {
         'underlying_ticker': ticker,
         'contract_type': option_type,
-        'expiration_date': TARGET_EXPIRATION,
+        'expiration_date': expiration or TARGET_EXPIRATION,
         'limit': 1000,  # Increased limit to get more strikes
         'as_of': 'trades',  # Get most recent trade data
         'sort': 'strike_price',
@@ -249,176 +765,261 @@ def get_options_chain(ticker, option_type, current_price, max_retries=5, initial
         'apiKey': API_KEY  # Ensure API key is included
     }
     
-    # Add a user agent to help with rate limiting
-    headers = {
-        'User-Agent': 'BenOptionsScanner/1.0',
-        'Authorization': f'Bearer {API_KEY}'
-    }
+    # Transient failures (429 with Retry-After, 5xx, dropped connections)
+    # are retried by the shared session's urllib3 Retry policy
+    try:
+        print(f"🔍 Requesting {ticker} {option_type.upper()} options:")
+        print(f"   URL: {url}")
+        print(f"   Params: {params}")
+        results = []
+        page_url, page_params = url, params
+        for page in range(1, MAX_CHAIN_PAGES + 1):
+            rate_limiter.acquire()
+            response = _SESSION.get(page_url, params=page_params, timeout=15)
+            print(f"✅ Page {page} received in {response.elapsed.total_seconds():.2f}s (Status: {response.status_code})")
+            response.raise_for_status()
+            page_data = parse_json(response)
+            results.extend(page_data.get('results') or ())
+            # Follow the cursor until the last page; next_url keeps the
+            # query filters but not the API key
+            page_url = page_data.get('next_url')
+            if not page_url:
+                break
+            page_params = {'apiKey': API_KEY}
+        else:
+            print(f"⚠️  Stopped after {MAX_CHAIN_PAGES} pages; the {ticker} {option_type} chain may be truncated")
+        data = {'results': results}
+    except requests.exceptions.RequestException as req_err:
+        print(f"\n❌ Request failed for {option_type} options on {ticker}: {req_err}")
+        return {'results': []}
+    except ValueError as e:
+        print(f"❌ Failed to parse JSON response: {e}")
+        return {'results': []}
     
-    # Add retry logic with exponential backoff and jitter
-    for attempt in range(max_retries):
+    # Process the options chain
+    if 'results' not in data or not data['results']:
+        print(f"ℹ️  No {option_type} options found for {ticker}")
+        return {'results': []}
+        
+    # Filter options by strike price range and add additional metrics
+    filtered_options = []
+    valid_options = 0
+    today = date.today()
+    
+    for contract in data['results']:
         try:
-            # Add jitter to avoid thundering herd problem
-            delay = initial_delay * (2 ** attempt) + random.uniform(0, 1)
-            if attempt > 0:
-                print(f"⏳ Retry attempt {attempt}/{max_retries-1} in {delay:.1f} seconds...")
-                time.sleep(delay)
-                
-            print(f"🔍 Request #{attempt+1} for {ticker} {option_type.upper()} options:")
-            print(f"   URL: {url}")
-            print(f"   Params: {params}")
-            
-            # Add timeout and better error handling
-            response = requests.get(
-                url, 
-                params=params, 
-                headers=headers, 
-                timeout=15  # Increased timeout
-            )
-            
-            print(f"✅ Response received in {response.elapsed.total_seconds():.2f}s (Status: {response.status_code})")
-            
-            # Check for rate limiting
-            if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', min(delay * 2, 60)))  # Cap at 60s
-                print(f"⚠️  Rate limited. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
+            strike_price = float(contract.get('strike_price', 0))
+            if strike_price <= 0:
                 continue
                 
-            # Handle other HTTP errors
-            response.raise_for_status()
-            
-            # Parse response
-            try:
-                data = response.json()
-            except ValueError as e:
-                print(f"❌ Failed to parse JSON response: {e}")
-                if attempt < max_retries - 1:
-                    continue
-                return {'results': []}
+            # Calculate moneyness
+            if option_type == 'put':
+                moneyness = (strike_price / current_price) - 1  # Negative for ITM, positive for OTM
+                is_itm = strike_price > current_price
+            else:  # call
+                moneyness = (strike_price / current_price) - 1  # Negative for OTM, positive for ITM
+                is_itm = strike_price < current_price
             
-            # Process the options chain
-            if 'results' not in data or not data['results']:
-                print(f"ℹ️  No {option_type} options found for {ticker}")
-                return {'results': []}
+            # Filter by strike price range
+            if min_strike <= strike_price <= max_strike:
+                # Keep only the fields used downstream; the rest of Polygon's
+                # contract payload would otherwise ride along into every copy
+                # and cache entry
+                option = {key: value for key, value in contract.items() if key in CHAIN_FIELDS}
                 
-            # Filter options by strike price range and add additional metrics
-            filtered_options = []
-            valid_options = 0
-            
-            for option in data['results']:
-                try:
-                    strike_price = float(option.get('strike_price', 0))
-                    if strike_price <= 0:
-                        continue
-                        
-                    # Calculate moneyness
-                    if option_type == 'put':
-                        moneyness = (strike_price / current_price) - 1  # Negative for ITM, positive for OTM
-                        is_itm = strike_price > current_price
-                    else:  # call
-                        moneyness = (strike_price / current_price) - 1  # Negative for OTM, positive for ITM
-                        is_itm = strike_price < current_price
-                    
-                    # Filter by strike price range
-                    if min_strike <= strike_price <= max_strike:
-                        # Add additional metrics
-                        option['ticker'] = ticker
-                        option['option_type'] = option_type
-                        option['current_price'] = current_price
-                        option['moneyness'] = moneyness
-                        option['is_itm'] = is_itm
-                        
-                        # Calculate days to expiration
-                        if 'expiration_date' in option:
-                            try:
-                                exp_date = datetime.strptime(option['expiration_date'], '%Y-%m-%d')
-                                dte = (exp_date - datetime.now()).days
-                                option['days_to_expiration'] = max(1, dte)  # Ensure at least 1 day
-                            except (ValueError, TypeError):
-                                option['days_to_expiration'] = 30  # Default if parsing fails
-                        else:
-                            option['days_to_expiration'] = 30  # Default if not provided
-                        
-                        # Add Greeks if available
-                        if 'greeks' in option and isinstance(option['greeks'], dict):
-                            option.update(option['greeks'])
-                        
-                        filtered_options.append(option)
-                        valid_options += 1
-                        
-                except (KeyError, ValueError, TypeError) as e:
-                    print(f"⚠️  Error processing option: {e}")
-                    continue
-        except requests.exceptions.RequestException as req_err:
-            if attempt == max_retries:
-                print(f"\n❌ Max retries reached for {option_type} options on {ticker}")
-                print(f"   Request error: {req_err}")
-                return []
-            print(f"\n⚠️  Request error (attempt {attempt + 1}): {req_err}, retrying...")
-            
-        except json.JSONDecodeError as json_err:
-            print(f"❌ Failed to parse JSON response: {json_err}")
-            if attempt == max_retries:
-                return []
+                # Add additional metrics
+                option['ticker'] = ticker
+                option['option_type'] = option_type
+                option['current_price'] = current_price
+                option['moneyness'] = moneyness
+                option['is_itm'] = is_itm
                 
-        except Exception as e:
-            if attempt == max_retries:
-                print(f"\n❌ Max retries reached for {option_type} options on {ticker}")
-                print(f"   Unexpected error: {e}")
-                import traceback
-                traceback.print_exc()
-                return []
-            print(f"\n⚠️  Unexpected error (attempt {attempt + 1}): {e}, retrying...")
+                # Calculate days to expiration
+                if 'expiration_date' in option:
+                    try:
+                        dte = (_parse_ymd(option['expiration_date']) - today).days
+                        option['days_to_expiration'] = max(1, dte)  # Ensure at least 1 day
+                    except (ValueError, TypeError):
+                        option['days_to_expiration'] = 30  # Default if parsing fails
+                else:
+                    option['days_to_expiration'] = 30  # Default if not provided
+                
+                # Add Greeks if available
+                if 'greeks' in option and isinstance(option['greeks'], dict):
+                    option.update(option['greeks'])
+                
+                filtered_options.append(option)
+                valid_options += 1
+                
+        except (KeyError, ValueError, TypeError) as e:
+            logger.debug("Skipping malformed %s option for %s: %s", option_type, ticker, e)
+            continue
     
-    return []
+    print(f"✅ {valid_options} {option_type} contracts within strike range")
+    return {'results': filtered_options}
 
 def get_greeks(contract):
     """Extract greeks from contract"""
     return contract.get('greeks', {})
 
+def blend_mid_price(bid: np.ndarray, ask: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """
+    Best-estimate premium per contract from bid/ask/last arrays.
+    
+    Uses the quote midpoint when both sides exist, otherwise the last trade
+    (averaged with whichever side is quoted), otherwise the largest price seen.
+    """
+    both = (bid > 0) & (ask > 0)
+    one_side = np.where(bid > 0, (bid + last) / 2, np.where(ask > 0, (ask + last) / 2, last))
+    fallback = np.where(last > 0, one_side, np.maximum(np.maximum(bid, ask), last))
+    return np.where(both, (bid + ask) / 2, fallback)
+
+# Output order of the option metric kernels below
+OPTION_METRIC_NAMES = (
+    'premium_yield', 'annualized_yield', 'return_on_capital', 'premium_per_day',
+    'break_even', 'intrinsic_value', 'time_value', 'time_value_pct',
+    'probability_itm', 'risk_reward_ratio', 'moneyness'
+)
+
+def _option_metrics_numpy(strike, mid, delta, dte, current_price, is_put):
+    """NumPy implementation of the option metric kernel, used when Numba is not installed."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if is_put:
+            # Capital at risk is the cash securing the put
+            premium_yield = np.where(strike > 0, mid / strike * 100, 0.0)
+            moneyness = (strike - current_price) / current_price if current_price > 0 else np.zeros_like(strike)
+            break_even = strike - mid
+            intrinsic_value = np.maximum(0.0, strike - current_price)
+            max_risk = strike - mid
+            risk_reward_ratio = np.where(max_risk > 0, mid / max_risk, np.inf)
+        else:
+            # Capital at risk is the 100 shares covering the call
+            premium_yield = (mid / current_price * 100) if current_price > 0 else np.zeros_like(mid)
+            moneyness = (current_price - strike) / current_price if current_price > 0 else np.zeros_like(strike)
+            break_even = strike + mid
+            intrinsic_value = np.maximum(0.0, current_price - strike)
+            risk_reward_ratio = np.zeros_like(mid)  # Unlimited risk for naked calls
+        
+        time_value = np.maximum(0.0, mid - intrinsic_value)
+        return (
+            premium_yield,
+            np.where(dte > 0, premium_yield * 365 / dte, 0.0),
+            premium_yield,
+            np.where(dte > 0, mid / dte, 0.0),
+            break_even,
+            intrinsic_value,
+            time_value,
+            np.where(mid > 0, time_value / mid * 100, 0.0),
+            # Delta is used as a rough probability-ITM estimate
+            np.abs(delta) * 100,
+            risk_reward_ratio,
+            moneyness,
+        )
+
+if njit is not None:
+    @njit(cache=True)
+    def _option_metrics_kernel(strike, mid, delta, dte, current_price, is_put):
+        """
+        Per-contract loop version of _option_metrics_numpy for Numba.
+        
+        Runs serially: callers already sit on scan worker threads, and a single
+        chain is too short for a parallel loop to pay off.
+        """
+        n = strike.shape[0]
+        out = np.empty((len(OPTION_METRIC_NAMES), n))
+        for i in range(n):
+            s = strike[i]
+            m = mid[i]
+            if is_put:
+                premium_yield = m / s * 100 if s > 0 else 0.0
+                moneyness = (s - current_price) / current_price if current_price > 0 else 0.0
+                break_even = s - m
+                intrinsic_value = max(0.0, s - current_price)
+                risk_reward_ratio = m / (s - m) if s - m > 0 else np.inf
+            else:
+                premium_yield = m / current_price * 100 if current_price > 0 else 0.0
+                moneyness = (current_price - s) / current_price if current_price > 0 else 0.0
+                break_even = s + m
+                intrinsic_value = max(0.0, current_price - s)
+                risk_reward_ratio = 0.0
+            time_value = max(0.0, m - intrinsic_value)
+            days = dte[i]
+            out[0, i] = premium_yield
+            out[1, i] = premium_yield * 365 / days if days > 0 else 0.0
+            out[2, i] = premium_yield
+            out[3, i] = m / days if days > 0 else 0.0
+            out[4, i] = break_even
+            out[5, i] = intrinsic_value
+            out[6, i] = time_value
+            out[7, i] = time_value / m * 100 if m > 0 else 0.0
+            out[8, i] = abs(delta[i]) * 100
+            out[9, i] = risk_reward_ratio
+            out[10, i] = moneyness
+        return out
+else:
+    _option_metrics_kernel = _option_metrics_numpy
+
+def option_metrics(strike: np.ndarray, mid: np.ndarray, delta: np.ndarray, dte: np.ndarray,
+                   current_price: float, is_put: bool) -> Dict[str, np.ndarray]:
+    """
+    Compute yield and risk metrics for a whole chain of contracts at once.
+    
+    The arithmetic runs in _option_metrics_kernel, compiled with Numba when
+    it is installed and plain NumPy otherwise.
+    
+    Args:
+        strike: Strike prices
+        mid: Premiums (see blend_mid_price)
+        delta: Option deltas
+        dte: Days to expiration (at least 1)
+        current_price: Current price of the underlying
+        is_put: Whether these are put options (True) or call options (False)
+        
+    Returns:
+        Dict of metric name to array, aligned with the inputs
+    """
+    as_f8 = lambda a: np.asarray(a, dtype=np.float64)
+    columns = _option_metrics_kernel(as_f8(strike), as_f8(mid), as_f8(delta), as_f8(dte),
+                                     float(current_price), bool(is_put))
+    return dict(zip(OPTION_METRIC_NAMES, columns))
+
+def safe_float(value, default=0.0):
+    """Convert value to float, returning default for None or unparseable values."""
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
 def calculate_premium_yield(contract, current_price, is_put):
     """Calculate premium yield and other metrics for an option contract"""
     try:
         # Extract basic contract details
         details = contract.get('details', {})
-        greeks = contract.get('greeks', {})
         day_data = contract.get('day', {})
         
         # Get strike price with error handling
         try:
-            strike = float(details.get('strike_price', 0))
-            if strike <= 0:
-                print(f"Invalid strike price: {strike}")
+            strike_price = float(details.get('strike_price', 0))
+            if strike_price <= 0:
+                logger.debug("Invalid strike price: %s", strike_price)
                 return None
         except (TypeError, ValueError) as e:
-            print(f"Error parsing strike price: {e}")
+            logger.debug("Error parsing strike price: %s", e)
             return None
             
-        expiration = details.get('expiration_date', '')
+        expiration_date = details.get('expiration_date', '')
         
         # Get pricing data - try multiple fields with error handling
-        def safe_float(value, default=0.0):
-            try:
-                return float(value) if value is not None else default
-            except (TypeError, ValueError):
-                return default
-                
         bid = safe_float(day_data.get('bid') or contract.get('bid'))
         ask = safe_float(day_data.get('ask') or contract.get('ask'))
         last = safe_float(day_data.get('close') or day_data.get('last'))
-        open_price = safe_float(day_data.get('open'))
+        # Scalar form of blend_mid_price; one contract does not pay for array setup
         if bid > 0 and ask > 0:
             mid_price = (bid + ask) / 2
         elif last > 0:
-            mid_price = last
-            # If only one of bid/ask is available, use it to improve mid
-            if bid > 0:
-                mid_price = (bid + last) / 2
-            elif ask > 0:
-                mid_price = (ask + last) / 2
+            mid_price = (bid + last) / 2 if bid > 0 else (ask + last) / 2 if ask > 0 else last
         else:
-            mid_price = max(bid, ask, last)  # Best available price
+            mid_price = max(bid, ask, last)
         
         # Skip if we can't determine a valid price
         if mid_price <= 0:
@@ -428,8 +1029,7 @@ def calculate_premium_yield(contract, current_price, is_put):
         dte = 0
         if expiration_date:
             try:
-                exp_date = datetime.strptime(expiration_date, '%Y-%m-%d').date()
-                dte = (exp_date - date.today()).days
+                dte = (_parse_ymd(expiration_date) - date.today()).days
                 dte = max(1, dte)  # Ensure at least 1 day to expiration
             except (ValueError, TypeError):
                 dte = 30  # Default to 30 days if can't parse date
@@ -443,64 +1043,40 @@ def calculate_premium_yield(contract, current_price, is_put):
         vega = float(contract.get('vega', 0) or 0)
         implied_vol = float(contract.get('implied_volatility', 0) or 0) * 100  # Convert to percentage
         
-        # Calculate moneyness (distance from current price as a percentage)
-        if current_price > 0:
-            if is_put:
-                moneyness = (strike_price - current_price) / current_price
-            else:
-                moneyness = (current_price - strike_price) / current_price
-        else:
-            moneyness = 0
-        
-        # Calculate premium yield (premium / strike price for puts, premium / current price for calls)
-        if is_put:
-            premium_yield = (mid_price / strike_price * 100) if strike_price > 0 else 0
-        else:
-            premium_yield = (mid_price / current_price * 100) if current_price > 0 else 0
-        
-        # Annualize the yield (simple method)
-        annualized_yield = premium_yield * (365 / dte) if dte > 0 else 0
-        
-        # Calculate return on capital
-        # For puts: premium / strike_price (cash needed to secure the put)
-        # For calls: premium / current_price (cash needed to buy 100 shares)
-        if is_put:
-            return_on_capital = (mid_price / strike_price * 100) if strike_price > 0 else 0
-        else:
-            return_on_capital = (mid_price / current_price * 100) if current_price > 0 else 0
-        
-        # Calculate break-even price
+        # Scalar forms of the option_metrics formulas summarize_options applies to chains
         if is_put:
+            premium_yield = mid_price / strike_price * 100
+            moneyness = (strike_price - current_price) / current_price if current_price > 0 else 0.0
             break_even = strike_price - mid_price
-            intrinsic_value = max(0, strike_price - current_price)
-        else:
-            break_even = strike_price + mid_price
-            intrinsic_value = max(0, current_price - strike_price)
-        
-        # Calculate time value and % of premium that's time value
-        time_value = max(0, mid_price - intrinsic_value)
-        time_value_pct = (time_value / mid_price * 100) if mid_price > 0 else 0
-        
-        # Estimate probability in the money (using delta as a rough estimate)
-        # Note: This is an approximation and not a true probability
-        probability_itm = abs(delta) * 100  # Convert to percentage
-        
-        # Calculate premium per day (theta equivalent)
-        premium_per_day = mid_price / dte if dte > 0 else 0
-        
-        # Calculate risk/reward ratio (simplified)
-        if is_put:
+            intrinsic_value = max(0.0, strike_price - current_price)
             max_risk = strike_price - mid_price
-            max_reward = mid_price
+            risk_reward_ratio = mid_price / max_risk if max_risk > 0 else float('inf')
         else:
-            max_risk = float('inf')  # Unlimited risk for naked calls
-            max_reward = mid_price
-        
-        risk_reward_ratio = (max_reward / max_risk) if max_risk > 0 else float('inf')
+            premium_yield = mid_price / current_price * 100 if current_price > 0 else 0.0
+            moneyness = (current_price - strike_price) / current_price if current_price > 0 else 0.0
+            break_even = strike_price + mid_price
+            intrinsic_value = max(0.0, current_price - strike_price)
+            risk_reward_ratio = 0.0  # Unlimited risk for naked calls
+        time_value = max(0.0, mid_price - intrinsic_value)
+        metrics = {
+            'premium_yield': premium_yield,
+            'annualized_yield': premium_yield * 365 / dte,
+            'return_on_capital': premium_yield,
+            'premium_per_day': mid_price / dte,
+            'break_even': break_even,
+            'intrinsic_value': intrinsic_value,
+            'time_value': time_value,
+            'time_value_pct': time_value / mid_price * 100,
+            'probability_itm': abs(delta) * 100,  # Delta as a rough probability-ITM estimate
+            'risk_reward_ratio': risk_reward_ratio,
+            'moneyness': moneyness,
+        }
         
         # Calculate bid-ask spread and spread as % of mid
         spread = ask - bid if bid > 0 and ask > 0 else 0
         spread_pct = (spread / mid_price * 100) if mid_price > 0 else 0
+        open_interest = int(contract.get('open_interest', 0) or 0)
+        volume = int(contract.get('volume', 0) or 0)
         
         return {
             # Core contract details
@@ -513,9 +1089,6 @@ def calculate_premium_yield(contract, current_price, is_put):
             'ask': ask,
             'last': last,
             'mid_price': mid_price,
-            'intrinsic_value': intrinsic_value,
-            'time_value': time_value,
-            'time_value_pct': time_value_pct,
             'bid_ask_spread': spread,
             'spread_pct': spread_pct,
             
@@ -526,40 +1099,34 @@ def calculate_premium_yield(contract, current_price, is_put):
             'vega': vega,
             'implied_volatility': implied_vol,
             
-            # Yield metrics
-            'premium_yield': premium_yield,
-            'annualized_yield': annualized_yield,
-            'return_on_capital': return_on_capital,
-            'premium_per_day': premium_per_day,
-            
-            # Risk metrics
-            'break_even': break_even,
-            'probability_itm': probability_itm,
-            'risk_reward_ratio': risk_reward_ratio,
-            'moneyness': moneyness,
-            'itm': intrinsic_value > 0,
+            # Yield and risk metrics
+            **metrics,
+            'itm': metrics['intrinsic_value'] > 0,
             
             # Volume and open interest
-            'open_interest': int(contract.get('open_interest', 0) or 0),
-            'volume': int(contract.get('volume', 0) or 0),
-            'volume_oi_ratio': (int(contract.get('volume', 0) or 0) / 
-                              int(contract.get('open_interest', 1) or 1)) if contract.get('open_interest') else 0
+            'open_interest': open_interest,
+            'volume': volume,
+            'volume_oi_ratio': (volume / open_interest) if open_interest else 0
         }
         
     except Exception as e:
-        print(f"Error calculating option metrics: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Error calculating option metrics: %s", e, exc_info=True)
         return {}
 
-def summarize_options(options, current_price, is_put=True):
+def summarize_options(options, current_price, is_put=True, risk_tolerance='medium'):
     """
     Process and summarize options data with enhanced metrics and filtering.
     
+    Contracts are validated one by one (dates and missing fields), then the
+    pricing and yield metrics for all valid contracts are computed as NumPy
+    array operations. The filter_and_sort_options predicates are applied
+    to those arrays as well, so dicts are only built for likely survivors.
+    
     Args:
         options (list): List of option contracts from Polygon API
         current_price (float): Current stock price
         is_put (bool, optional): Whether these are put options. Defaults to True.
+        risk_tolerance (str, optional): Risk tolerance level passed to the filters
         
     Returns:
         list: List of processed option dictionaries with comprehensive metrics
@@ -574,9 +1141,6 @@ def summarize_options(options, current_price, is_put=True):
     print(f"Processing {len(options)} options...")
     print("-"*60)
     
-    processed_options = []
-    skipped_count = 0
-    
     # Track reasons for skipping options
     skip_reasons = {
         'no_pricing': 0,
@@ -584,131 +1148,137 @@ def summarize_options(options, current_price, is_put=True):
         'invalid_strike': 0,
         'invalid_expiration': 0,
         'missing_data': 0,
+        'filtered': 0,
         'other': 0
     }
     
-    for i, contract in enumerate(options):
+    # Same bounds as filter_and_sort_options; the delta and open-interest gates
+    # run in the validation loop, the rest on the arrays below
+    params, min_delta, max_delta, min_premium, min_open_interest = filter_thresholds(is_put, risk_tolerance)
+    min_delta = max(min_delta, params['pop_min'])  # Delta doubles as the probability-ITM proxy
+    
+    # Validation pass: keep contracts with a quote, a strike and a future expiration
+    today = date.today()
+    dte_by_expiration = {}  # A chain usually shares one expiration, so parse it once
+    valid = []
+    rows = []
+    add_row, add_valid = rows.append, valid.append
+    first_error = None  # One representative traceback instead of one per bad row
+    for contract in options:
         try:
-            # Skip if no pricing data
-            if not contract.get('last_quote'):
+            last_quote = contract.get('last_quote')
+            if not last_quote:
                 skip_reasons['no_pricing'] += 1
-                skipped_count += 1
                 continue
             
-            # Get strike price and expiration
             strike = contract.get('strike_price')
-            expiration = contract.get('expiration_date')
-            
-            # Validate strike price
             if not strike or strike <= 0:
                 skip_reasons['invalid_strike'] += 1
-                skipped_count += 1
                 continue
             
-            # Calculate days to expiration
-            dte = 0
-            if expiration:
+            expiration = contract.get('expiration_date')
+            if not expiration:
+                skip_reasons['missing_data'] += 1
+                continue
+            dte = dte_by_expiration.get(expiration)
+            if dte is None:
                 try:
-                    expiration_date = datetime.strptime(expiration, '%Y-%m-%d').date()
-                    dte = (expiration_date - date.today()).days
-                    if dte <= 0:  # Skip expired options
-                        skip_reasons['expired'] += 1
-                        skipped_count += 1
-                        continue
-                except (ValueError, TypeError) as e:
+                    dte = dte_by_expiration[expiration] = (_parse_ymd(expiration) - today).days
+                except (ValueError, TypeError):
                     skip_reasons['invalid_expiration'] += 1
-                    skipped_count += 1
                     continue
-            else:
-                skip_reasons['missing_data'] += 1
-                skipped_count += 1
-                continue
-            
-            # Get bid/ask/last prices with fallbacks
-            last_quote = contract.get('last_quote', {}) or {}
-            bid = float(last_quote.get('bid', 0) or 0)
-            ask = float(last_quote.get('ask', 0) or 0)
-            last = float(last_quote.get('last', 0) or 0)
-            
-            # Skip if no valid pricing data
-            if bid <= 0 and ask <= 0 and last <= 0:
-                skip_reasons['no_pricing'] += 1
-                skipped_count += 1
+            if dte <= 0:  # Skip expired options
+                skip_reasons['expired'] += 1
                 continue
             
-            # Calculate mid price with better fallback logic
-            if bid > 0 and ask > 0:
-                mid = (bid + ask) / 2
-            elif last > 0:
-                mid = last
-                # If only one of bid/ask is available, use it to improve mid
-                if bid > 0:
-                    mid = (bid + last) / 2
-                elif ask > 0:
-                    mid = (ask + last) / 2
-            else:
-                mid = max(bid, ask, last)
-            
-            # Skip if we can't determine a valid price
-            if mid <= 0:
-                skipped_count += 1
-                continue
-                
-            # Calculate delta (absolute value for puts)
+            # Cheapest filters first, before the quote fields are converted
             delta = abs(float(contract.get('delta', 0) or 0))
-            
-            # Calculate premium yield and other metrics
-            metrics = calculate_premium_yield(contract, current_price, is_put)
-            
-            # Get open interest and volume with defaults
             open_interest = int(contract.get('open_interest', 0) or 0)
-            volume = int(contract.get('volume', 0) or 0)
-            
-            # Get implied volatility (convert to percentage)
-            iv = float(contract.get('implied_volatility', 0) or 0) * 100
-            
-            # Calculate moneyness and ITM status
-            if is_put:
-                moneyness = (strike - current_price) / current_price
-                itm = strike > current_price
-            else:
-                moneyness = (current_price - strike) / current_price
-                itm = strike < current_price
+            if open_interest < min_open_interest or not min_delta <= delta <= max_delta:
+                skip_reasons['filtered'] += 1
+                continue
             
-            # Create option dictionary with all metrics
-            option_data = {
+            add_row((
+                float(strike), dte,
+                float(last_quote.get('bid', 0) or 0),
+                float(last_quote.get('ask', 0) or 0),
+                float(last_quote.get('last', 0) or 0),
+                delta,
+                open_interest,
+                int(contract.get('volume', 0) or 0),
+                float(contract.get('implied_volatility', 0) or 0) * 100
+            ))
+            add_valid(contract)
+        except (TypeError, ValueError, AttributeError):
+            # Only malformed quote fields land here; the checks above reject the rest
+            if first_error is None:
+                first_error = traceback.format_exc()
+            skip_reasons['other'] += 1
+    if first_error:
+        logger.debug("%d malformed options skipped; first failure:\n%s",
+                     skip_reasons['other'], first_error)
+    
+    processed_options = []
+    if rows:
+        strike, dte, bid, ask, last, delta, open_interest, volume, iv = map(np.array, zip(*rows))
+        
+        mid = blend_mid_price(bid, ask, last)
+        priced = mid > 0
+        skip_reasons['no_pricing'] += int(np.count_nonzero(~priced))
+        
+        # Remaining filter_and_sort_options predicates, evaluated before any
+        # metric or dict is built so rejected contracts cost only a mask bit
+        strike_pct = strike / current_price
+        if is_put:
+            strike_ok = (strike_pct >= MIN_STRIKE_PCT) & (strike_pct <= 1.0)
+        else:
+            strike_ok = (strike_pct >= 1.0) & (strike_pct <= MAX_STRIKE_PCT)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            filter_spread_pct = np.where(priced, (ask - bid) * 100.0 / mid, 100.0)
+        keep = priced & strike_ok & (mid >= min_premium) & (filter_spread_pct <= params['spread_max'] * 100)
+        skip_reasons['filtered'] += int(np.count_nonzero(priced & ~keep))
+        
+        idx = np.flatnonzero(keep)
+        strike, dte, bid, ask, last, delta, open_interest, volume, iv, mid = (
+            a[idx] for a in (strike, dte, bid, ask, last, delta, open_interest, volume, iv, mid)
+        )
+        valid = [valid[i] for i in idx]
+        
+        metrics = option_metrics(strike, mid, delta, dte, current_price, is_put)
+        two_sided = (bid > 0) & (ask > 0)
+        spread = np.where(two_sided, ask - bid, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spread_pct = np.where(two_sided, spread / mid * 100, 0.0)
+        itm = strike > current_price if is_put else strike < current_price
+        
+        for i in range(len(valid)):
+            contract = valid[i]
+            processed_options.append({
                 'contract_symbol': contract.get('ticker', '').strip(),
-                'strike_price': float(strike or 0),
-                'expiration_date': expiration or '',
-                'dte': dte,
-                'bid': bid,
-                'ask': ask,
-                'last': last,
-                'mid_price': mid,
-                'delta': delta,
-                'open_interest': open_interest,
-                'volume': volume,
-                'implied_volatility': iv,
-                'premium_yield': metrics.get('premium_yield', 0),
-                'annualized_yield': metrics.get('annualized_yield', 0),
-                'return_on_capital': metrics.get('return_on_capital', 0),
-                'break_even': metrics.get('break_even', 0),
-                'probability_itm': metrics.get('probability_itm', 0),
-                'moneyness': moneyness,
-                'itm': itm,
-                'bid_ask_spread': ask - bid if bid > 0 and ask > 0 else 0,
-                'spread_percent': ((ask - bid) / mid * 100) if bid > 0 and ask > 0 and mid > 0 else 0
-            }
-            
-            processed_options.append(option_data)
-            
-            # Print progress for large datasets
-            if (i + 1) % 50 == 0:
-                print(f"Processed {i+1} options...")
-            
-        except Exception as e:
-            print(f"Error processing option {i+1}: {str(e)}")
-            continue
+                'strike_price': float(strike[i]),
+                'expiration_date': contract['expiration_date'],
+                'dte': int(dte[i]),
+                'days_to_expiration': int(dte[i]),
+                'bid': float(bid[i]),
+                'ask': float(ask[i]),
+                'last': float(last[i]),
+                'mid_price': float(mid[i]),
+                'last_trade_price': float(mid[i]),  # Fallback for one-sided quotes
+                'delta': float(delta[i]),
+                'open_interest': int(open_interest[i]),
+                'volume': int(volume[i]),
+                'implied_volatility': float(iv[i]),
+                'premium_yield': float(metrics['premium_yield'][i]),
+                'annualized_yield': float(metrics['annualized_yield'][i]),
+                'return_on_capital': float(metrics['return_on_capital'][i]),
+                'break_even': float(metrics['break_even'][i]),
+                'probability_itm': float(metrics['probability_itm'][i]),
+                'moneyness': float(metrics['moneyness'][i]),
+                'itm': bool(itm[i]),
+                'bid_ask_spread': float(spread[i]),
+                'spread_percent': float(spread_pct[i])
+            })
+    skipped_count = len(options) - len(processed_options)
     
     # Print summary of processed options
     print("\n" + "="*60)
@@ -724,7 +1294,7 @@ def summarize_options(options, current_price, is_put=True):
     # Print top 3 strikes that made it through
     if processed_options:
         print("\n🔝 TOP 3 OPPORTUNITIES BY PREMIUM YIELD:")
-        sorted_options = sorted(processed_options, key=lambda x: x.get('annualized_yield', 0), reverse=True)[:3]
+        sorted_options = heapq.nlargest(3, processed_options, key=annualized_yield_key)
         for i, opt in enumerate(sorted_options, 1):
             print(f"  {i}. ${opt['strike_price']} {option_type} | "
                   f"${opt.get('mid_price', 0):.2f} | "
@@ -737,11 +1307,98 @@ def summarize_options(options, current_price, is_put=True):
     if not processed_options:
         print("No valid options found after processing")
     
-    # Filter and sort the options
-    return filter_and_sort_options(processed_options, current_price, is_put)
+    # Rank the survivors (the filters above already ran on the arrays)
+    return filter_and_sort_options(processed_options, current_price, is_put, risk_tolerance)
+
+def chain_to_array(options: List[Dict]) -> np.ndarray:
+    """
+    Copy the numeric fields of an options chain into an OPTION_DTYPE array.
+    
+    Args:
+        options: Option dicts carrying every REQUIRED_OPTION_FIELDS key
+        
+    Returns:
+        Structured array with one row per option, in input order
+    """
+    return np.array(
+        [(opt['strike_price'], opt['delta'], opt['mid_price'], opt['bid'], opt['ask'],
+          opt.get('last_trade_price', 0) or 0, opt['open_interest'], opt['volume'],
+          opt['days_to_expiration'])
+         for opt in options],
+        dtype=OPTION_DTYPE
+    )
+
+def _score_chain_numpy(strike, quoted_mid, bid, ask, last_trade, days_to_exp, capital):
+    """NumPy implementation of score_chain, used when Numba is not installed."""
+    # Fall back to the last trade when either side of the quote is missing
+    mid_price = np.where((bid != 0) & (ask != 0), quoted_mid, last_trade)
+    per_day = mid_price / days_to_exp  # The only division by DTE; the rest scale this
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread_pct = np.where(mid_price > 0, (ask - bid) * 100.0 / mid_price, 100.0)
+        annualized_yield = np.where(strike > 0, per_day * 36500.0 / strike, 0.0)
+        return_on_capital = np.where(capital > 0, mid_price / capital * 100, 0.0)
+        monthly_roc = np.where(capital > 0, per_day * 3000.0 / capital, 0.0)
+    return mid_price, spread_pct, annualized_yield, return_on_capital, monthly_roc, per_day
+
+if njit is not None:
+    @njit(cache=True)
+    def score_chain(strike, quoted_mid, bid, ask, last_trade, days_to_exp, capital):
+        """
+        Compute mid price, bid-ask spread %, annualized yield, return on
+        capital, monthly ROC and premium per day per contract in one pass.
+        
+        Numeric-only kernel over float64 arrays so Numba can compile it;
+        ticker and date handling stay in filter_and_sort_options.
+        """
+        n = strike.shape[0]
+        mid_price = np.empty(n)
+        spread_pct = np.empty(n)
+        annualized_yield = np.empty(n)
+        return_on_capital = np.empty(n)
+        monthly_roc = np.empty(n)
+        premium_per_day = np.empty(n)
+        for i in range(n):
+            # Fall back to the last trade when either side of the quote is missing
+            mid = quoted_mid[i] if bid[i] != 0 and ask[i] != 0 else last_trade[i]
+            per_day = mid / days_to_exp[i]  # The only division by DTE; the rest scale this
+            mid_price[i] = mid
+            spread_pct[i] = (ask[i] - bid[i]) * 100.0 / mid if mid > 0 else 100.0
+            annualized_yield[i] = per_day * 36500.0 / strike[i] if strike[i] > 0 else 0.0
+            if capital[i] > 0:
+                return_on_capital[i] = mid / capital[i] * 100.0
+                monthly_roc[i] = per_day * 3000.0 / capital[i]
+            else:
+                return_on_capital[i] = 0.0
+                monthly_roc[i] = 0.0
+            premium_per_day[i] = per_day
+        return mid_price, spread_pct, annualized_yield, return_on_capital, monthly_roc, premium_per_day
+else:
+    score_chain = _score_chain_numpy
+
+def filter_thresholds(is_put: bool, risk_tolerance: str = 'medium') -> Tuple[Dict, float, float, float, int]:
+    """
+    Resolve the filter bounds used by filter_and_sort_options.
+    
+    Args:
+        is_put: Whether the bounds are for puts (True) or calls (False)
+        risk_tolerance: Risk tolerance level ('low', 'medium', 'high')
+        
+    Returns:
+        Tuple of (risk params, min delta, max delta, min premium, min open interest)
+    """
+    risk_params = RISK_PARAMS_PUT if is_put else RISK_PARAMS_CALL
+    params = risk_params.get(risk_tolerance.lower(), risk_params['medium'])
+    
+    # Apply risk-based adjustments
+    min_delta = max(MIN_DELTA, params['delta_min'])
+    max_delta = min(MAX_DELTA, params['delta_max'])
+    min_premium = MIN_PREMIUM * params['min_premium_mod']
+    min_open_interest = max(MIN_OPEN_INTEREST, 50)  # Higher OI for lower risk
+    return params, min_delta, max_delta, min_premium, min_open_interest
 
 def filter_and_sort_options(options: List[Dict], current_price: float, is_put: bool = True, 
-                          risk_tolerance: str = 'medium') -> List[Dict]:
+                          risk_tolerance: str = 'medium',
+                          annotations: Optional[Dict] = None) -> List[Dict]:
     """
     Filter and sort options based on advanced criteria and rank them for potential trades.
     
@@ -750,6 +1407,7 @@ def filter_and_sort_options(options: List[Dict], current_price: float, is_put: b
         current_price: Current price of the underlying asset
         is_put: Whether these are put options (True) or call options (False)
         risk_tolerance: Risk tolerance level ('low', 'medium', 'high')
+        annotations: Extra fields (e.g. ticker, expiration) set on every survivor
         
     Returns:
         List of filtered and ranked option dictionaries with additional metrics
@@ -758,42 +1416,7 @@ def filter_and_sort_options(options: List[Dict], current_price: float, is_put: b
         print("No options provided for filtering.")
         return []
     
-    # Set risk-based parameters
-    risk_params = {
-        'low': {
-            'pop_min': 0.75,
-            'delta_min': 0.30 if is_put else 0.15,
-            'delta_max': 0.70 if is_put else 0.50,
-            'min_premium_mod': 1.5,  # Higher premium for lower risk
-            'spread_max': 0.15,  # Tighter spreads
-            'tag': '💰 Income'
-        },
-        'medium': {
-            'pop_min': 0.50,
-            'delta_min': 0.15 if is_put else 0.05,
-            'delta_max': 0.85 if is_put else 0.70,
-            'min_premium_mod': 1.0,
-            'spread_max': 0.30,
-            'tag': '📈 Directional'
-        },
-        'high': {
-            'pop_min': 0.30,
-            'delta_min': 0.05 if is_put else 0.01,
-            'delta_max': 0.95 if is_put else 0.90,
-            'min_premium_mod': 0.5,  # Accept lower premiums
-            'spread_max': 0.50,  # Wider spreads allowed
-            'tag': '🎯 Speculative'
-        }
-    }
-    
-    # Get parameters based on risk tolerance
-    params = risk_params.get(risk_tolerance.lower(), risk_params['medium'])
-    
-    # Apply risk-based adjustments
-    min_delta = max(MIN_DELTA, params['delta_min'])
-    max_delta = min(MAX_DELTA, params['delta_max'])
-    min_premium = MIN_PREMIUM * params['min_premium_mod']
-    min_open_interest = max(MIN_OPEN_INTEREST, 50)  # Higher OI for lower risk
+    params, min_delta, max_delta, min_premium, min_open_interest = filter_thresholds(is_put, risk_tolerance)
     
     option_type = 'Put' if is_put else 'Call'
     
@@ -805,116 +1428,186 @@ def filter_and_sort_options(options: List[Dict], current_price: float, is_put: b
     print(f"  - Max bid-ask spread: {params['spread_max']*100:.0f}%")
     print(f"  - Strike range: {MIN_STRIKE_PCT*100:.1f}% to {MAX_STRIKE_PCT*100:.1f}% of current price")
     
-    for opt in options:
-        try:
-            # Skip if missing required fields
-            required_fields = ['strike_price', 'delta', 'mid_price', 'days_to_expiration',
-                             'bid', 'ask', 'open_interest', 'volume']
-            if not all(k in opt for k in required_fields):
-                continue
-            
-            strike = opt['strike_price']
-            delta = abs(opt['delta'])  # Use absolute value for puts
-            
-            # Skip if delta is outside our target range
-            if not (min_delta <= delta <= max_delta):
-                continue
-            
-            # Skip if strike is outside our defined percentage range
-            strike_pct = strike / current_price
-            if is_put and (strike_pct < MIN_STRIKE_PCT or strike_pct > 1.0):
-                continue
-            elif not is_put and (strike_pct > MAX_STRIKE_PCT or strike_pct < 1.0):
-                continue
-            
-            # Skip if open interest is too low
-            if opt['open_interest'] < min_open_interest:
-                continue
-                
-            # Skip if premium is too low
-            if opt.get('mid_price', 0) < min_premium:
-                continue
-            
-            # Calculate bid-ask spread as % of mid price
-            spread = opt['ask'] - opt['bid']
-            mid_price = opt.get('mid_price', (opt['bid'] + opt['ask']) / 2) if opt['bid'] and opt['ask'] else opt.get('last_trade_price', 0)
-            spread_pct = (spread / mid_price * 100) if mid_price > 0 else 100
-            
-            # Debug log for each option that passes all filters
-            print(f"  ✓ {option_type.upper()} {strike} | Δ {delta:.2f} | ${mid_price:.2f} | OI: {opt['open_interest']} | Vol: {opt['volume']}")
-            print(f"     Bid/Ask: ${opt.get('bid', 0):.2f}/${opt.get('ask', 0):.2f} | Spread: {spread_pct:.1f}% | DTE: {opt.get('days_to_expiration', 'N/A')}")
-            
-            # Skip if spread is too wide
-            if spread_pct > MAX_BID_ASK_SPREAD_PCT:
-                continue
-            
-            # Calculate days to expiration
-            dte = max(1, opt.get('days_to_expiration', 30))
-            
-            # Calculate probability ITM (using delta's absolute value as proxy)
-            probability_itm = abs(delta)
-            
-            # Skip if probability ITM is below threshold for risk tolerance
-            if probability_itm < params['pop_min']:
-                print(f"  ✗ ${strike} | Probability ITM {probability_itm*100:.1f}% < {params['pop_min']*100:.0f}% min")
-                continue
-            
-            # Calculate annualized yield
-            annualized_yield = (mid_price / strike) * (365 / max(1, days_to_exp)) * 100 if strike > 0 else 0
-            
-            # Determine play type based on delta and risk profile
-            play_type = params['tag']
-            
-            # Add to filtered list with additional metrics
-            opt.update({
-                'mid_price': mid_price,
-                'spread_pct': spread_pct * 100,  # Store as percentage
-                'probability_itm': probability_itm * 100,  # Store as percentage
-                'annualized_yield': annualized_yield,
-                'days_to_expiration': days_to_exp,
-                'play_type': play_type,
-                'liquidity_score': min(100, (volume + open_interest) / 100),  # Simple liquidity score (0-100)
-                'risk_tolerance': risk_tolerance.upper()
-            })
-            
-            print(f"  ✓ ${strike} | {play_type} | Δ {delta:.2f} | "
-                  f"${mid_price:.2f} | OI: {open_interest} | "
-                  f"PoP: {probability_itm*100:.0f}% | Yield: {annualized_yield:.1f}%")
-            
-            filtered.append(opt)
-            
-        except Exception as e:
-            print(f"  ⚠️  Error processing option: {str(e)}")
-            continue
-    
-    # Sort by the selected ranking metric
-    if filtered:
-        print(f"✅ Found {len(filtered)} viable {option_type} trades")
-        
-        # Define ranking metrics (higher is better)
-        rank_metrics = {
-            'annualized_yield': lambda x: x.get('annualized_yield', 0),
-            'annualized_roc': lambda x: x.get('annualized_roc', 0),
-            'premium_per_day': lambda x: x.get('premium_per_day', 0),
-            'risk_reward': lambda x: x.get('risk_reward_ratio', 0),
-            'probability_itm': lambda x: x.get('probability_itm', 0)
-        }
-        
-        # Sort by the selected metric (descending)
-        if TRADE_RANK_METRIC in rank_metrics:
-            filtered.sort(key=rank_metrics[TRADE_RANK_METRIC], reverse=True)
-        else:
-            # Default sort by annualized ROC
-            filtered.sort(key=rank_metrics['annualized_roc'], reverse=True)
-        
-        # Limit to top N trades
-        filtered = filtered[:MAX_TRADES_PER_TYPE]
+    candidates = [opt for opt in options if REQUIRED_OPTION_FIELDS <= opt.keys()]
+    
+    # Load the numeric fields into one structured array and evaluate the
+    # filter predicates for the whole chain at once.
+    arr = chain_to_array(candidates)
+    strike = arr['strike']
+    delta = np.abs(arr['delta'])
+    quoted_mid = arr['mid']
+    bid = arr['bid']
+    ask = arr['ask']
+    last_trade = arr['last']
+    open_interest = arr['oi']
+    volume = arr['vol']
+    days_to_exp = np.maximum(1, arr['dte'])
+    
+    strike_pct = strike / current_price
+    # Delta's absolute value is used as the probability-ITM proxy
+    probability_itm = delta
+    
+    if is_put:
+        strike_ok = (strike_pct >= MIN_STRIKE_PCT) & (strike_pct <= 1.0)
     else:
+        strike_ok = (strike_pct >= 1.0) & (strike_pct <= MAX_STRIKE_PCT)
+    
+    # Cheapest predicates first: everything that reads the raw columns is
+    # masked before the scoring kernel, so only plausible rows get scored.
+    delta_ok = (delta >= min_delta) & (delta <= max_delta) & (probability_itm >= params['pop_min'])
+    oi_ok = open_interest >= min_open_interest
+    premium_ok = quoted_mid >= min_premium
+    rows = np.flatnonzero(delta_ok & oi_ok & premium_ok & strike_ok)
+    total = len(candidates)
+    strike, delta, probability_itm = strike[rows], delta[rows], probability_itm[rows]
+    open_interest, volume, days_to_exp = open_interest[rows], volume[rows], days_to_exp[rows]
+    candidates = [candidates[i] for i in rows]
+    
+    # Return on the capital securing the trade: the strike for puts, the shares for calls
+    capital = strike if is_put else np.full_like(strike, current_price)
+    mid_price, spread_pct, annualized_yield, return_on_capital, monthly_roc, premium_per_day = score_chain(
+        strike, quoted_mid[rows], bid[rows], ask[rows], last_trade[rows],
+        days_to_exp.astype(np.float64), capital
+    )
+    break_even = strike - mid_price if is_put else strike + mid_price
+    annualized_roc = return_on_capital * 365.0 / days_to_exp
+    liquidity_score = np.minimum(100.0, (volume + open_interest) / 100.0)
+    
+    # The spread needs the kernel's mid-price fallback, so it is checked last
+    mask = spread_pct <= params['spread_max'] * 100
+    
+    # Rank the survivors on the score column; only the kept rows' dicts are touched
+    survivors = np.flatnonzero(mask)
+    # One diagnostic line; a contract failing several checks counts under each
+    print(f"  Filtered {survivors.size}/{total}; rejected: "
+          f"delta={total - np.count_nonzero(delta_ok)} "
+          f"premium={total - np.count_nonzero(premium_ok)} "
+          f"OI={total - np.count_nonzero(oi_ok)} "
+          f"strike={total - np.count_nonzero(strike_ok)} "
+          f"spread={rows.size - survivors.size}")
+    if not survivors.size:
         print(f"⚠️ No {option_type} options passed all filters")
+        return []
+    print(f"✅ Found {survivors.size} viable {option_type} trades")
+    
+    rank_field = RANK_METRIC_FIELDS.get(TRADE_RANK_METRIC, 'annualized_roc')
+    computed = {'annualized_yield': annualized_yield, 'annualized_roc': annualized_roc,
+                'probability_itm': probability_itm, 'premium_per_day': premium_per_day}
+    if rank_field in computed:
+        scores = computed[rank_field][survivors]
+    else:
+        scores = np.fromiter((candidates[i].get(rank_field, 0) or 0 for i in survivors),
+                             dtype=np.float64, count=survivors.size)
+    
+    play_type = params['tag']
+    risk_label = risk_tolerance.upper()
+    filtered = []
+    for i in survivors[top_k_indices(scores, MAX_TRADES_PER_TYPE)]:
+        opt = candidates[i]
+        opt.update({
+            'mid_price': float(mid_price[i]),
+            'spread_pct': float(spread_pct[i]),
+            'probability_itm': float(probability_itm[i]) * 100,  # Store as percentage
+            'annualized_yield': float(annualized_yield[i]),
+            'return_on_capital': float(return_on_capital[i]),
+            'monthly_roc': float(monthly_roc[i]),
+            'annualized_roc': float(annualized_roc[i]),
+            'premium_per_day': float(premium_per_day[i]),
+            'break_even': float(break_even[i]),
+            'days_to_expiration': int(days_to_exp[i]),
+            'play_type': play_type,
+            'liquidity_score': float(liquidity_score[i]),  # Simple liquidity score (0-100)
+            'risk_tolerance': risk_label
+        })
+        if annotations:
+            opt.update(annotations)
+        
+        print(f"  ✓ ${opt['strike_price']} | {play_type} | Δ {delta[i]:.2f} | "
+              f"${mid_price[i]:.2f} | OI: {opt['open_interest']} | "
+              f"PoP: {probability_itm[i]*100:.0f}% | Yield: {annualized_yield[i]:.1f}%")
+        
+        filtered.append(opt)
     
     return filtered
 
-def generate_trade_idea_sheet(puts: List[Dict], calls: List[Dict], output_dir: str = 'output', simulate_forward: bool = True) -> str:
+def format_option_rows(options: List[Dict]) -> str:
+    """Render options as OPTION_TABLE_ROW lines, with missing fields shown as 0."""
+    return "\n".join(
+        OPTION_TABLE_ROW.format(*OPTION_TABLE_FIELDS({**OPTION_TABLE_DEFAULTS, **opt}))
+        for opt in options
+    )
+
+def format_trade_sheet_rows(options: List[Dict], high_yield_pct: float) -> List[str]:
+    """
+    Render trade idea sheet table rows, with missing fields shown as 0.
+    
+    Args:
+        options: Option dictionaries, optionally carrying a 'simulation' result
+        high_yield_pct: Premium yield above which a row is tagged as high yield
+        
+    Returns:
+        One TRADE_SHEET_ROW line per option
+    """
+    rows = []
+    for opt in options:
+        sim = opt.get('simulation') or {}
+        probability_of_profit = sim.get('probability_of_profit', 0)
+        tags = []
+        if opt.get('premium_yield', 0) > high_yield_pct: tags.append("💰 High Yield")
+        if probability_of_profit > 70: tags.append("🎯 High Prob")
+        if opt.get('volume', 0) > 1000: tags.append("📈 High Volume")
+        
+        rows.append(TRADE_SHEET_ROW.format_map(ZeroDefaultDict({
+            **TRADE_SHEET_DEFAULTS, **opt,
+            'probability_of_profit': probability_of_profit,
+            'realized_yield': sim.get('realized_yield', 0),
+            'max_drawdown': abs(sim.get('max_drawdown', 0)),
+            'tags': ' '.join(tags)
+        })))
+    return rows
+
+def write_lines(buf, lines: List[str]):
+    """Write each line to buf (any text stream) followed by a newline."""
+    if lines:
+        # One join per section rather than two write calls per line
+        buf.write('\n'.join(lines))
+        buf.write('\n')
+
+def sync_report(report):
+    """Flush a finished report and fsync it to disk when REPORT_FSYNC is set."""
+    if REPORT_FSYNC:
+        report.flush()
+        os.fsync(report.fileno())
+
+def annualized_yield_key(opt: Dict) -> float:
+    """Sort key for options that may lack an annualized yield (treated as 0)."""
+    return opt.get('annualized_yield', 0)
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+    
+    Equal scores keep input order, including ties at the cut-off: the
+    earliest of the rows sharing the k-th score are the ones kept. NaN
+    scores rank last.
+    
+    Uses np.partition to find the k-th score so only the k survivors are
+    fully sorted.
+    """
+    if k <= 0 or not scores.size:
+        return np.empty(0, dtype=np.intp)
+    if scores.size > k:
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+        kth = np.partition(scores, scores.size - k)[scores.size - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - above.size]
+        top = np.sort(np.concatenate((above, ties)))
+        return top[np.argsort(-scores[top], kind='stable')]
+    return np.argsort(-scores, kind='stable')
+
+def generate_trade_idea_sheet(puts: List[Dict], calls: List[Dict], output_dir: str = 'output',
+                              simulate_forward: Optional[bool] = True, write_report: bool = True,
+                              underlying_prices: Optional[Dict[str, float]] = None) -> Optional[str]:
     """
     Generate an enhanced markdown report with trading opportunities, simulations, and recommendations.
     
@@ -922,256 +1615,170 @@ def generate_trade_idea_sheet(puts: List[Dict], calls: List[Dict], output_dir: s
         puts: List of filtered put options
         calls: List of filtered call options
         output_dir: Directory to save the report
-        simulate_forward: Whether to simulate forward or backtest
+        simulate_forward: Whether to simulate forward or backtest; None skips simulation
+        write_report: Whether to write the markdown report. When False only the
+            simulation results are attached to the top puts/calls.
+        underlying_prices: Ticker -> current price map. Derived from the
+            options' underlying_price fields when not given.
         
     Returns:
-        Path to the generated report
+        Path to the generated report, or None if no report was written
     """
-    os.makedirs(output_dir, exist_ok=True)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = os.path.join(output_dir, f'trade_ideas_{timestamp}.md')
-    
-    # Prepare markdown content
-    md_content = [
-        "# 📊 Daily Options Trade Report",
-        f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n",
-        "---"
-    ]
-    
-    # Get current prices and prepare market data
-    underlying_prices = {}
-    tickers = set()
-    
-    for option in puts + calls:
-        ticker = option.get('ticker')
-        price = option.get('underlying_price')
-        if ticker and price:
-            underlying_prices[ticker] = price
-            tickers.add(ticker)
-    
-    # --- Market Overview Section ---
-    md_content.extend([
-        "## 🌐 Market Overview",
-        "### Key Indices (as of close)",
-        "- **S&P 500 (SPY):** $XXX.XX (X.XX%) | 50D MA: $XXX.XX | 200D MA: $XXX.XX",
-        "- **NASDAQ (QQQ):** $XXX.XX (X.XX%) | 50D MA: $XXX.XX | 200D MA: $XXX.XX",
-        "- **VIX:** XX.XX (X.XX%) | 20D Avg: XX.XX",
-        "\n### Market Sentiment",
-        "- **Put/Call Ratio (5-day avg):** X.XX",
-        "- **Market Trend:** [Bullish/Neutral/Bearish] based on [criteria]",
-        "- **Sector Performance (Today): Tech +X.XX%, Financials +X.XX%, Healthcare +X.XX%"
-    ])
-    
-    # --- Simulation Setup ---
-    md_content.extend([
-        "\n## 🔄 Simulation Parameters",
-        f"- **Simulation Type:** {'Forward' if simulate_forward else 'Backtest'}",
-        "- **Simulation Period:** 30 days",
-        "- **Volatility Model:** GARCH(1,1)",
-        "- **Monte Carlo Iterations:** 10,000"
-    ])
-    
-    # Simulate top trades (top 5 of each)
-    top_puts = puts[:5]
-    top_calls = calls[:5]
-    
-    # Add simulation data to top trades
-    simulated_puts = simulate_recommended_trades(top_puts, underlying_prices, simulate_forward)
-    simulated_calls = simulate_recommended_trades(top_calls, underlying_prices, simulate_forward)
-    
-    # Update the original lists with simulation results
-    for i, put in enumerate(simulated_puts):
-        if i < len(puts):
-            puts[i].update(put)
-    
-    for i, call in enumerate(simulated_calls):
-        if i < len(calls):
-            calls[i].update(call)
-    
-    # --- Trade Recommendations ---
-    md_content.extend(["\n## 🎯 Top Trade Recommendations"])
-    
-    # Add top 3 puts with detailed metrics
-    for i, put in enumerate(puts[:3], 1):
-        sim = put.get('simulation', {})
-        md_content.extend([
-            f"### {i}. {put.get('ticker', 'N/A')} - ${put.get('strike_price', 0):.2f} Put",
-            "```",
-            f"Entry:       ${put.get('underlying_price', 0):.2f}",
-            f"Strike:      ${put.get('strike_price', 0):.2f} ({put.get('strike_pct_otm', 0):.1f}% OTM)",
-            f"Premium:     ${put.get('mid_price', 0):.2f} (${put.get('bid', 0):.2f} / ${put.get('ask', 0):.2f})",
-            f"Yield:       {put.get('premium_yield', 0):.1f}% ({put.get('annualized_yield', 0):.1f}% annualized)",
-            f"Expiration:  {put.get('expiration', 'N/A')} (in {put.get('days_to_expiration', 0)} days)",
-            f"Delta:       {put.get('delta', 0):.2f} | Gamma: {put.get('gamma', 0):.4f}",
-            f"Theta:       ${put.get('theta', 0):.2f}/day | Vega: ${put.get('vega', 0):.2f}",
-            f"Open Int:    {put.get('open_interest', 0):,} | Volume: {put.get('volume', 0):,}",
-            "\n📊 Simulation Results:",
-            f"- Expected P/L:   {sim.get('realized_yield', 0):.1f}%",
-            f"- Max Drawdown:   {abs(sim.get('max_drawdown', 0)):.1f}%",
-            f"- Prob. Profit:   {sim.get('probability_of_profit', 0):.1f}%",
-            f"- Breakeven:      ${sim.get('breakeven', 0):.2f}",
-            f"- Expected Exit:  ${sim.get('exit_price', 0):.2f} in {sim.get('held_days', 0)} days",
-            "```",
-            f"**Trade Rationale:** [Brief analysis of why this is a good trade]"
-        ])
+    if not puts and not calls:
+        print("No trades to report")
+        return None
     
-    # Add top 3 calls with detailed metrics
-    for i, call in enumerate(calls[:3], 1):
-        sim = call.get('simulation', {})
-        md_content.extend([
-            f"### {i+3}. {call.get('ticker', 'N/A')} - ${call.get('strike_price', 0):2f} Call",
-            "```",
-            f"Entry:       ${call.get('underlying_price', 0):.2f}",
-            f"Strike:      ${call.get('strike_price', 0):.2f} ({call.get('strike_pct_otm', 0):.1f}% OTM)",
-            f"Premium:     ${call.get('mid_price', 0):.2f} (${call.get('bid', 0):.2f} / ${call.get('ask', 0):.2f})",
-            f"Yield:       {call.get('premium_yield', 0):.1f}% ({call.get('annualized_yield', 0):.1f}% annualized)",
-            f"Expiration:  {call.get('expiration', 'N/A')} (in {call.get('days_to_expiration', 0)} days)",
-            f"Delta:       {call.get('delta', 0):.2f} | Gamma: {call.get('gamma', 0):.4f}",
-            f"Theta:       ${call.get('theta', 0):.2f}/day | Vega: ${call.get('vega', 0):.2f}",
-            f"Open Int:    {call.get('open_interest', 0):,} | Volume: {call.get('volume', 0):,}",
-            "\n📊 Simulation Results:",
-            f"- Expected P/L:   {sim.get('realized_yield', 0):.1f}%",
-            f"- Max Drawdown:   {abs(sim.get('max_drawdown', 0)):.1f}%",
-            f"- Prob. Profit:   {sim.get('probability_of_profit', 0):.1f}%",
-            f"- Breakeven:      ${sim.get('breakeven', 0):.2f}",
-            f"- Expected Exit:  ${sim.get('exit_price', 0):.2f} in {sim.get('held_days', 0)} days",
-            "```",
-            f"**Trade Rationale:** [Brief analysis of why this is a good trade]"
-        ])
+    # Get current prices and prepare market data (keys double as the ticker set)
+    if underlying_prices is None:
+        underlying_prices = {
+            option['ticker']: option['underlying_price']
+            for option in chain(puts, calls)
+            if option.get('ticker') and option.get('underlying_price')
+        }
     
-    # --- Trade Lists ---
-    # Add best puts table
-    md_content.extend([
-        "\n## 💰 Cash-Secured Puts (Top 10)",
-        "| Ticker | Price | Strike | Premium | Yield | Annualized | DTE | Δ | POP% | Sim P/L% | Max DD% | Tags |",
-        "|--------|-------|--------|---------|-------|------------|-----|---|------|----------|---------|------|"
-    ])
+    # Callers pass every ticker's trades back to back, so rank them here;
+    # nlargest keeps input order for ties, like a stable sort would
+    puts = heapq.nlargest(TRADE_SHEET_TOP_TRADES, puts, key=annualized_yield_key)
+    calls = heapq.nlargest(TRADE_SHEET_TOP_TRADES, calls, key=annualized_yield_key)
     
-    for put in puts[:10]:
-        sim = put.get('simulation', {})
-        tags = []
-        if put.get('premium_yield', 0) > 3.0: tags.append("💰 High Yield")
-        if sim.get('probability_of_profit', 0) > 70: tags.append("🎯 High Prob")
-        if put.get('volume', 0) > 1000: tags.append("📈 High Volume")
-        
-        md_content.append(
-            f"| {put.get('ticker', 'N/A')} "
-            f"| ${put.get('underlying_price', 0):.2f} "
-            f"| ${put.get('strike_price', 0):.2f} "
-            f"| ${put.get('mid_price', 0):.2f} "
-            f"| {put.get('premium_yield', 0):.1f}% "
-            f"| {put.get('annualized_yield', 0):.1f}% "
-            f"| {put.get('days_to_expiration', 0)} "
-            f"| {put.get('delta', 0):.2f} "
-            f"| {sim.get('probability_of_profit', 0):.1f}% "
-            f"| {sim.get('realized_yield', 0):.1f}% "
-            f"| {abs(sim.get('max_drawdown', 0)):.1f}% "
-            f"| {' '.join(tags)} |"
-        )
+    if simulate_forward is not None:
+        # Simulate top trades (top 5 of each); results are attached in place
+        simulate_recommended_trades(puts[:5], underlying_prices, simulate_forward)
+        simulate_recommended_trades(calls[:5], underlying_prices, simulate_forward)
     
-    # Add best calls table
-    md_content.extend([
-        "\n## 📈 Covered Calls (Top 10)",
-        "| Ticker | Price | Strike | Premium | Yield | Annualized | DTE | Δ | POP% | Sim P/L% | Max DD% | Tags |",
-        "|--------|-------|--------|---------|-------|------------|-----|---|------|----------|---------|------|"
-    ])
+    if not write_report:
+        return None
     
-    for call in calls[:10]:
-        sim = call.get('simulation', {})
-        tags = []
-        if call.get('premium_yield', 0) > 2.0: tags.append("💰 High Yield")
-        if sim.get('probability_of_profit', 0) > 70: tags.append("🎯 High Prob")
-        if call.get('volume', 0) > 1000: tags.append("📈 High Volume")
-        
-        md_content.append(
-            f"| {call.get('ticker', 'N/A')} "
-            f"| ${call.get('underlying_price', 0):.2f} "
-            f"| ${call.get('strike_price', 0):.2f} "
-            f"| ${call.get('mid_price', 0):.2f} "
-            f"| {call.get('premium_yield', 0):.1f}% "
-            f"| {call.get('annualized_yield', 0):.1f}% "
-            f"| {call.get('days_to_expiration', 0)} "
-            f"| {call.get('delta', 0):.2f} "
-            f"| {sim.get('probability_of_profit', 0):.1f}% "
-            f"| {sim.get('realized_yield', 0):.1f}% "
-            f"| {abs(sim.get('max_drawdown', 0)):.1f}% "
-            f"| {' '.join(tags)} |"
-        )
+    os.makedirs(output_dir, exist_ok=True)
+    now = datetime.now()
+    now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    filename = os.path.join(output_dir, f'trade_ideas_{timestamp}.md')
     
-    # --- Trade Execution ---
-    md_content.extend([
-        "\n## 🛠️ Trade Execution",
-        "### Suggested Position Sizing",
-        "- **Account Size:** $XX,XXX",
-        "- **Max Risk per Trade:** X% of portfolio",
-        "- **Position Size:** X contracts (max risk: $XXX)",
-        "\n### Entry/Exit Rules",
-        "- **Entry:** Limit order at mid-price or better",
-        "- **Stop Loss:** -XX% of premium received",
-        "- **Profit Target:** XX% of max profit",
-        "- **Management:** Consider rolling at XX DTE or XX% of max profit"
-    ])
-    
-    # --- Risk Management ---
-    md_content.extend([
-        "\n## ⚠️ Risk Management",
-        "### Portfolio Allocation",
-        "- Max X% of portfolio in any single underlying",
-        "- Max X% in any single sector",
-        "- Max X% in any single strategy",
-        "\n### Risk Metrics",
-        "- Portfolio Beta: X.XX",
-        "- Portfolio Theta: $XX.XX/day",
-        "- Portfolio Delta: $X,XXX per 1% move",
-        "- Portfolio Vega: $XX.XX per 1 volatility point"
-    ])
-    
-    # --- Market Data & Analysis ---
-    md_content.extend([
-        "\n## 📊 Market Data & Analysis",
-        "### Implied vs Historical Volatility",
-        "- **IV Percentile:** XX% (Xth percentile)",
-        "- **IV Rank:** XX (X/100)",
-        "- **Current IV/HV Ratio:** X.XX",
-        "\n### Technical Analysis",
-        "- **Trend:** [Up/Down/Sideways]",
-        "- **Key Levels:** Support at $XX.XX, Resistance at $XX.XX",
-        "- **RSI(14):** XX.X (Oversold/Overbought/Neutral)",
-        "- **MACD:** [Bullish/Bearish] crossover"
-    ])
-    
-    # --- Economic Calendar ---
-    md_content.extend([
-        "\n## 📅 Upcoming Events",
-        "| Date | Time (ET) | Event | Impact |",
-        "|------|----------|-------|--------|",
-        "| Tues, Jun 10 | 8:30 AM | CPI m/m | 🟡 Medium |",
-        "| Wed, Jun 11 | 2:00 PM | FOMC Statement | 🔴 High |",
-        "| Thu, Jun 12 | 8:30 AM | Initial Claims | 🟢 Low |"
-    ])
-    
-    # --- Notes & Disclaimers ---
-    md_content.extend([
-        "\n## 📝 Notes & Disclaimers",
-        "### Key Assumptions",
-        "- Options pricing uses mid-point between bid/ask",
-        "- Greeks calculated using Black-Scholes model",
-        "- Simulation uses historical volatility and Monte Carlo methods",
-        "- No transaction costs or slippage included in simulations",
-        "\n### Risk Disclosure",
-        "⚠️ **Options trading involves substantial risk of loss and is not suitable for all investors.**",
-        "- Past performance is not indicative of future results",
-        "- Simulated results do not reflect actual trading and may not account for all risks",
-        "- Consider your risk tolerance and investment objectives before trading",
-        "\n### Data Sources",
-        "- Market data provided by Polygon.io",
-        f"- Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"- Simulation mode: {'Forward' if simulate_forward else 'Backtest'}"
-    ])
-    
-    # Write to file
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(line for line in md_content if line is not None))
+    if simulate_forward is None:
+        simulation_mode = 'Skipped'
+    else:
+        simulation_mode = 'Forward' if simulate_forward else 'Backtest'
+    
+    # Stream each section straight into a large write buffer
+    with open(filename, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as report:
+        write_lines(report, [
+            "# 📊 Daily Options Trade Report",
+            f"*Generated: {now_str}*\n",
+            "---"
+        ])
+        
+        # --- Market Overview Section ---
+        write_lines(report, [
+            "## 🌐 Market Overview",
+            "### Key Indices (as of close)",
+            "- **S&P 500 (SPY):** $XXX.XX (X.XX%) | 50D MA: $XXX.XX | 200D MA: $XXX.XX",
+            "- **NASDAQ (QQQ):** $XXX.XX (X.XX%) | 50D MA: $XXX.XX | 200D MA: $XXX.XX",
+            "- **VIX:** XX.XX (X.XX%) | 20D Avg: XX.XX",
+            "\n### Market Sentiment",
+            "- **Put/Call Ratio (5-day avg):** X.XX",
+            "- **Market Trend:** [Bullish/Neutral/Bearish] based on [criteria]",
+            "- **Sector Performance (Today): Tech +X.XX%, Financials +X.XX%, Healthcare +X.XX%"
+        ])
+        
+        # --- Simulation Setup ---
+        write_lines(report, [
+            "\n## 🔄 Simulation Parameters",
+            f"- **Simulation Type:** {simulation_mode}",
+            "- **Simulation Period:** 30 days",
+            "- **Volatility Model:** GARCH(1,1)",
+            "- **Monte Carlo Iterations:** 10,000"
+        ])
+        
+        # --- Trade Recommendations ---
+        write_lines(report, ["\n## 🎯 Top Trade Recommendations"])
+        
+        # Add top 3 puts, then top 3 calls (numbered 4-6), with detailed metrics
+        for i, put in enumerate(puts[:3], 1):
+            _emit_top_trade(put, i, 'Put', report.write)
+        for i, call in enumerate(calls[:3], 4):
+            _emit_top_trade(call, i, 'Call', report.write)
+        
+        # --- Trade Lists ---
+        # Add best puts table
+        write_lines(report, ["\n## 💰 Cash-Secured Puts (Top 10)", *TRADE_SHEET_TABLE_HEADER])
+        write_lines(report, format_trade_sheet_rows(puts[:10], high_yield_pct=3.0))
+        
+        # Add best calls table
+        write_lines(report, ["\n## 📈 Covered Calls (Top 10)", *TRADE_SHEET_TABLE_HEADER])
+        write_lines(report, format_trade_sheet_rows(calls[:10], high_yield_pct=2.0))
+        
+        # --- Trade Execution ---
+        write_lines(report, [
+            "\n## 🛠️ Trade Execution",
+            "### Suggested Position Sizing",
+            "- **Account Size:** $XX,XXX",
+            "- **Max Risk per Trade:** X% of portfolio",
+            "- **Position Size:** X contracts (max risk: $XXX)",
+            "\n### Entry/Exit Rules",
+            "- **Entry:** Limit order at mid-price or better",
+            "- **Stop Loss:** -XX% of premium received",
+            "- **Profit Target:** XX% of max profit",
+            "- **Management:** Consider rolling at XX DTE or XX% of max profit"
+        ])
+        
+        # --- Risk Management ---
+        write_lines(report, [
+            "\n## ⚠️ Risk Management",
+            "### Portfolio Allocation",
+            "- Max X% of portfolio in any single underlying",
+            "- Max X% in any single sector",
+            "- Max X% in any single strategy",
+            "\n### Risk Metrics",
+            "- Portfolio Beta: X.XX",
+            "- Portfolio Theta: $XX.XX/day",
+            "- Portfolio Delta: $X,XXX per 1% move",
+            "- Portfolio Vega: $XX.XX per 1 volatility point"
+        ])
+        
+        # --- Market Data & Analysis ---
+        write_lines(report, [
+            "\n## 📊 Market Data & Analysis",
+            "### Implied vs Historical Volatility",
+            "- **IV Percentile:** XX% (Xth percentile)",
+            "- **IV Rank:** XX (X/100)",
+            "- **Current IV/HV Ratio:** X.XX",
+            "\n### Technical Analysis",
+            "- **Trend:** [Up/Down/Sideways]",
+            "- **Key Levels:** Support at $XX.XX, Resistance at $XX.XX",
+            "- **RSI(14):** XX.X (Oversold/Overbought/Neutral)",
+            "- **MACD:** [Bullish/Bearish] crossover"
+        ])
+        
+        # --- Economic Calendar ---
+        write_lines(report, [
+            "\n## 📅 Upcoming Events",
+            "| Date | Time (ET) | Event | Impact |",
+            "|------|----------|-------|--------|",
+            "| Tues, Jun 10 | 8:30 AM | CPI m/m | 🟡 Medium |",
+            "| Wed, Jun 11 | 2:00 PM | FOMC Statement | 🔴 High |",
+            "| Thu, Jun 12 | 8:30 AM | Initial Claims | 🟢 Low |"
+        ])
+        
+        # --- Notes & Disclaimers ---
+        write_lines(report, [
+            "\n## 📝 Notes & Disclaimers",
+            "### Key Assumptions",
+            "- Options pricing uses mid-point between bid/ask",
+            "- Greeks calculated using Black-Scholes model",
+            "- Simulation uses historical volatility and Monte Carlo methods",
+            "- No transaction costs or slippage included in simulations",
+            "\n### Risk Disclosure",
+            "⚠️ **Options trading involves substantial risk of loss and is not suitable for all investors.**",
+            "- Past performance is not indicative of future results",
+            "- Simulated results do not reflect actual trading and may not account for all risks",
+            "- Consider your risk tolerance and investment objectives before trading",
+            "\n### Data Sources",
+            "- Market data provided by Polygon.io",
+            f"- Report generated on {now_str}",
+            f"- Simulation mode: {simulation_mode}"
+        ])
+        sync_report(report)
     
     print(f"✅ Report generated: {filename}")
     return filename
@@ -1221,7 +1828,7 @@ def format_option_display(options, is_put=True):
     
     return '\n'.join(lines)
 
-def save_to_markdown(ticker: str, price: float, puts: List[Dict] = None, calls: List[Dict] = None, filename: str = None) -> str:
+def save_to_markdown(ticker: str, price: float, puts: List[Dict] = None, calls: List[Dict] = None, filename: str = None) -> Optional[str]:
     """
     Save options analysis to a markdown file with enhanced metrics.
     
@@ -1233,104 +1840,81 @@ def save_to_markdown(ticker: str, price: float, puts: List[Dict] = None, calls:
         filename: Output filename (default: 'output/{ticker}_analysis_YYYYMMDD_HHMMSS.md')
         
     Returns:
-        Path to the saved file
+        Path to the saved file, or None if there was nothing to save
     """
     # Handle default arguments
     if puts is None:
         puts = []
     if calls is None:
         calls = []
+    
+    if not puts and not calls:
+        print("No trades to report")
+        return None
         
     # Create output directory if it doesn't exist
     os.makedirs('output', exist_ok=True)
     
+    # One clock read so the filename, header and footer agree
+    now = datetime.now()
+    
     # Generate filename if not provided
     if filename is None:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         filename = f'output/{ticker}_analysis_{timestamp}.md'
     
-    # Prepare markdown content
-    md_content = [
-        f"# 📊 Options Analysis: {ticker}",
-        f"**Current Price:** ${price:.2f}  ",
-        f"**Last Updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-    ]
-    
-    # Add puts section if available
-    if puts:
-        md_content.extend([
-            "## 💰 Put Options",
-            "| Strike | Premium | Δ | Yield | Annualized | ROC | DTE | Prob ITM | R/R | OI | Volume |",
-            "|--------|---------|--|-------|------------|-----|-----|----------|-----|----|--------|"
+    # Stream each section straight into a large write buffer
+    with open(filename, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as report:
+        write_lines(report, [
+            f"# 📊 Options Analysis: {ticker}",
+            f"**Current Price:** ${price:.2f}  ",
+            f"**Last Updated:** {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
         ])
         
-        # Sort puts by annualized yield and take top 20
-        for put in sorted(puts, key=lambda x: x.get('annualized_yield', 0), reverse=True)[:20]:
-            md_content.append(
-                f"| ${put.get('strike_price', 0):.2f} | "
-                f"${put.get('mid_price', 0):.2f} | "
-                f"{put.get('delta', 0):.2f} | "
-                f"{put.get('premium_yield', 0):.1f}% | "
-                f"{put.get('annualized_yield', 0):.1f}% | "
-                f"{put.get('monthly_roc', 0):.1f}% | "
-                f"{put.get('days_to_expiration', 0)} | "
-                f"{put.get('probability_itm', 0):.1f}% | "
-                f"1:{put.get('risk_reward_ratio', 0):.1f} | "
-                f"{put.get('open_interest', 0):,} | "
-                f"{put.get('volume', 0):,} |"
-            )
-    else:
-        md_content.append("\nNo qualifying put options found.\n")
-    
-    # Add calls section if available
-    if calls:
-        md_content.extend([
-            "\n## 📈 Call Options",
-            "| Strike | Premium | Δ | Yield | Annualized | ROC | DTE | Prob ITM | R/R | OI | Volume |",
-            "|--------|---------|--|-------|------------|-----|-----|----------|-----|----|--------|"
-        ])
+        # Add puts section if available; top 20 by annualized yield
+        if puts:
+            write_lines(report, ["## 💰 Put Options", *OPTION_TABLE_HEADER,
+                              format_option_rows(heapq.nlargest(20, puts, key=annualized_yield_key))])
+        else:
+            write_lines(report, ["\nNo qualifying put options found.\n"])
         
-        # Sort calls by annualized yield and take top 20
-        for call in sorted(calls, key=lambda x: x.get('annualized_yield', 0), reverse=True)[:20]:
-            md_content.append(
-                f"| ${call.get('strike_price', 0):.2f} | "
-                f"${call.get('mid_price', 0):.2f} | "
-                f"{call.get('delta', 0):.2f} | "
-                f"{call.get('premium_yield', 0):.1f}% | "
-                f"{call.get('annualized_yield', 0):.1f}% | "
-                f"{call.get('monthly_roc', 0):.1f}% | "
-                f"{call.get('days_to_expiration', 0)} | "
-                f"{call.get('probability_itm', 0):.1f}% | "
-                f"1:{call.get('risk_reward_ratio', 0):.1f} | "
-                f"{call.get('open_interest', 0):,} | "
-                f"{call.get('volume', 0):,} |"
-            )
-    else:
-        md_content.append("\nNo qualifying call options found.\n")
-    
-    # Add footer with timestamp
-    md_content.append(f"\n*Generated on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}*")
-    
-    # Write to file
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(md_content))
+        # Add calls section if available; top 20 by annualized yield
+        if calls:
+            write_lines(report, ["\n## 📈 Call Options", *OPTION_TABLE_HEADER,
+                              format_option_rows(heapq.nlargest(20, calls, key=annualized_yield_key))])
+        else:
+            write_lines(report, ["\nNo qualifying call options found.\n"])
+        
+        # Add footer with timestamp
+        report.write(f"\n*Generated on {now.strftime('%Y-%m-%d at %H:%M:%S')}*")
+        sync_report(report)
     
     return filename
 
-def print_header():
-    """Print analysis header with market status"""
-    print("\n" + "="*80)
-    print(f"📊 OPTIONS SCREENER - {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    print("="*80)
+def print_header(now: Optional[datetime] = None):
+    """
+    Print analysis header with market status.
+    
+    Args:
+        now: Timestamp shown in the header (default: the current time)
+        
+    Returns:
+        Markdown lines for the report header
+    """
+    now = now or datetime.now()
+    header_ts = now.strftime('%Y-%m-%d %H:%M')
+    print("\n" + BANNER_BAR)
+    print(f"📊 OPTIONS SCREENER - {header_ts}")
+    print(BANNER_BAR)
     
     market_status = get_market_status()
     status_msg = f"✅ Market is currently {'open' if market_status == 'open' else 'closed'}" if market_status else "❓ Market status unknown"
     
     md_content = [
-        f"# 📊 Options Screener - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        f"# 📊 Options Screener - {header_ts}",
         "",
         "## 📈 Market Status",
-        f"- **Current time:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S %Z')}",
+        f"- **Current time:** {now.strftime('%Y-%m-%d %H:%M:%S %Z')}",
         f"- {status_msg}",
         "",
         "## 🔍 Analysis Parameters",
@@ -1346,6 +1930,8 @@ def print_header():
     
     return md_content
 
+@ttl_cache(ttl_seconds=EXPIRATIONS_CACHE_TTL, key=lambda ticker, *args, **kwargs: ticker,
+           cacheable=lambda exps: exps != [TARGET_EXPIRATION], persist=True)
 def get_available_expirations(ticker, current_price, max_retries=3):
     """
     Get available expiration dates for a given ticker.
@@ -1371,17 +1957,18 @@ def get_available_expirations(ticker, current_price, max_retries=3):
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, params=params, timeout=10)
+            rate_limiter.acquire()
+            response = _SESSION.get(url, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = parse_json(response)
             
             if 'results' in data and data['results']:
                 # Extract unique expiration dates
-                expirations = sorted(list(set([
-                    result['expiration_date'] 
+                expirations = sorted({
+                    result['expiration_date']
                     for result in data['results']
                     if 'expiration_date' in result
-                ])))
+                })
                 
                 if expirations:
                     print(f"  Found {len(expirations)} expiration dates for {ticker}")
@@ -1416,26 +2003,23 @@ def select_best_expiration(expirations, min_dte=10, max_dte=45):
         return TARGET_EXPIRATION
     
     today = date.today()
-    valid_expirations = []
+    dated_expirations = []
     
     for exp_date_str in expirations:
         try:
-            exp_date = datetime.strptime(exp_date_str, '%Y-%m-%d').date()
-            dte = (exp_date - today).days
-            if min_dte <= dte <= max_dte:
-                valid_expirations.append((exp_date_str, dte))
+            dated_expirations.append((exp_date_str, (_parse_ymd(exp_date_str) - today).days))
         except (ValueError, TypeError):
             continue
     
+    valid_expirations = [(d, dte) for d, dte in dated_expirations if min_dte <= dte <= max_dte]
+    
     if not valid_expirations:
         print(f"  No valid expirations found in {min_dte}-{max_dte} DTE range, using closest")
+        if not dated_expirations:
+            return TARGET_EXPIRATION
         # Find the closest expiration to our target DTE
         target_dte = (min_dte + max_dte) // 2
-        return min(
-            [(d, abs((datetime.strptime(d, '%Y-%m-%d').date() - today).days - target_dte)) 
-             for d in expirations],
-            key=lambda x: x[1]
-        )[0]
+        return min(dated_expirations, key=lambda x: abs(x[1] - target_dte))[0]
     
     # Sort by DTE closest to our target range
     target_dte = (min_dte + max_dte) // 2
@@ -1444,12 +2028,253 @@ def select_best_expiration(expirations, min_dte=10, max_dte=45):
     print(f"  Selected expiration: {best_exp[0]} ({best_exp[1]} DTE)")
     return best_exp[0]
 
-def run(risk_tolerance: str = 'medium'):
+# Returned for every missing or failed chain; the tuple keeps it read-only
+EMPTY_CHAIN = {'results': ()}
+
+def fetch_chain_for_expiration(ticker: str, option_type: str, price: float, expiration: str) -> Dict:
+    """
+    Fetch one side of a ticker's options chain for a single expiration.
+    
+    Errors are reported and turned into the shared, immutable EMPTY_CHAIN so
+    that a failure on one side does not discard the other.
+    
+    Args:
+        ticker: Stock ticker symbol
+        option_type: 'put' or 'call'
+        price: Current stock price
+        expiration: Expiration date (YYYY-MM-DD)
+        
+    Returns:
+        Dict with a 'results' list of option dicts
+    """
+    label = option_type.upper()
+    print(f"{'📉' if option_type == 'put' else '📈'} Fetching {label} options...")
+    try:
+        # Failure paths return [] or a dict without results; treat all as empty
+        results = (get_options_chain(ticker, option_type, price, expiration=expiration) or {}).get('results')
+        if not results:
+            print(f"⚠️  No {label} options data available")
+            return EMPTY_CHAIN
+        # get_options_chain already asks the API for this expiration only
+        print(f"✅ Found {len(results)} {label} contracts for {expiration}")
+        # Shallow-copy so filtering never mutates the cached chain
+        return {'results': [dict(opt) for opt in results]}
+    except Exception as e:
+        print(f"⚠️  Error fetching {label} options: {str(e)}")
+        return EMPTY_CHAIN
+
+def generate_rationale(opt: Dict, is_put: bool) -> str:
+    """
+    Build the markdown trade rationale for a recommended option.
+    
+    Args:
+        opt: Filtered option dictionary
+        is_put: Whether the option is a put (True) or call (False)
+        
+    Returns:
+        Markdown rationale text
+    """
+    ticker = opt.get('ticker', 'UNKNOWN')
+    strike = opt.get('strike_price', 0)
+    current_price = opt.get('current_price', 0)
+    premium = opt.get('mid_price', 0)
+    dte = opt.get('days_to_expiration', 0)
+    delta = opt.get('delta', 0)
+    pop = opt.get('probability_itm', 0) / 100  # Convert back to decimal
+    
+    # Determine if ITM/OTM
+    if is_put:
+        moneyness = "ITM" if strike > current_price else "OTM"
+        breakeven = strike - premium
+        max_profit = premium
+        max_loss = strike - premium
+    else:  # call
+        moneyness = "ITM" if strike < current_price else "OTM"
+        breakeven = strike + premium
+        max_profit = premium
+        max_loss = "Unlimited"
+    
+    # Generate rationale based on option metrics
+    rationale = []
+    
+    # Play type and risk profile
+    rationale.append(f"**{opt.get('play_type', 'Trade')}** ({opt.get('risk_tolerance', 'MEDIUM')} risk): ")
+    
+    # Basic trade setup
+    if is_put:
+        rationale.append(f"Sell ${strike:.2f} put ({moneyness}) "
+                       f"for ${premium:.2f} premium, {dte} DTE.")
+    else:
+        rationale.append(f"Sell ${strike:.2f} call ({moneyness}) "
+                       f"for ${premium:.2f} premium, {dte} DTE.")
+    
+    # Key metrics
+    rationale.append(f"\n- **Probability of Profit (PoP):** {pop*100:.0f}%")
+    rationale.append(f"- **Annualized Yield:** {opt.get('annualized_yield', 0):.1f}%")
+    rationale.append(f"- **Delta:** {delta:.2f}")
+    rationale.append(f"- **Breakeven:** ${breakeven:.2f}")
+    
+    # Risk/Reward
+    rationale.append("\n**Risk/Reward:**")
+    rationale.append(f"- Max Profit: ${max_profit:.2f} per contract")
+    rationale.append(f"- Max Loss: ${max_loss:.2f} per contract" if isinstance(max_loss, (int, float)) else f"- Max Loss: {max_loss} (naked call)")
+    
+    # Liquidity note
+    if opt.get('liquidity_score', 0) < 20:
+        rationale.append("\n⚠️ **Liquidity Warning:** Low open interest/volume - consider smaller position size.")
+    
+    return "\n".join(rationale)
+
+def scan_ticker(ticker: str, risk_tolerance: str = 'medium',
+                price: Optional[float] = None) -> Dict:
+    """
+    Fetch, filter and rank the options chain for a single ticker.
+    
+    Safe to run from worker threads: the selected expiration is passed to
+    get_options_chain explicitly instead of through TARGET_EXPIRATION.
+    
+    Args:
+        ticker: Stock ticker symbol
+        risk_tolerance: Risk tolerance level ('low', 'medium', 'high')
+        price: Prefetched stock price; fetched with get_stock_price if None
+        
+    Returns:
+        Dict with 'ticker', 'price', 'expiration', 'puts', 'calls' and
+        'error' (None on success) keys
+    """
+    result = {
+        'ticker': ticker,
+        'price': None,
+        'expiration': TARGET_EXPIRATION,
+        'puts': [],
+        'calls': [],
+        'error': None
+    }
+    
+    print(f"\n{BANNER_BAR}\n📊 Analyzing {ticker} (Risk: {risk_tolerance.upper()})")
+    print("-"*80)
+    
+    try:
+        # Transient HTTP failures are retried by the shared session
+        if price is None:
+            print(f"🔍 Fetching current price for {ticker}...")
+            price = get_stock_price(ticker)
+        if not price or price <= 0:
+            raise ValueError(f"Invalid price {price} for {ticker}")
+        print(f"✅ Current price: ${price:.2f}")
+        result['price'] = price
+        
+        # Get available expirations and select the best one
+        try:
+            print("\n📅 Fetching available option expirations...")
+            expirations = get_available_expirations(ticker, price)
+            result['expiration'] = select_best_expiration(expirations, min_dte=10, max_dte=45)
+            print(f"🎯 Selected expiration: {result['expiration']}")
+        except Exception as e:
+            print(f"⚠️  Error selecting expiration date: {str(e)}")
+            print(f"⚠️  Using default expiration: {result['expiration']}")
+        expiration = result['expiration']
+        
+        # Get options chain with progress indication and error handling
+        print(f"\n🔍 Fetching options chain for {ticker} (Exp: {expiration})...")
+        
+        # Fetch both sides concurrently; each request still goes through rate_limiter
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            puts_future = pool.submit(fetch_chain_for_expiration, ticker, 'put', price, expiration)
+            calls_future = pool.submit(fetch_chain_for_expiration, ticker, 'call', price, expiration)
+            puts_chain = puts_future.result()
+            calls_chain = calls_future.result()
+        
+        # Each side is filtered from its own list, so only the counts are combined
+        contract_count = len(puts_chain['results']) + len(calls_chain['results'])
+        if not contract_count:
+            raise ValueError("No valid options found for either puts or calls")
+            
+        print(f"✅ Found {contract_count} options contracts")
+        
+    except Exception as e:
+        result['error'] = f"❌ Error fetching data for {ticker}: {str(e)}"
+        print(result['error'])
+        return result
+    
+    # Process puts and calls
+    print(f"📊 Processing options data for {ticker}...")
+    annotations = {'ticker': ticker, 'current_price': price, 'expiration': expiration}
+    
+    try:
+        if puts_chain['results']:
+            result['puts'] = filter_and_sort_options(
+                puts_chain['results'], 
+                price, 
+                is_put=True,
+                risk_tolerance=risk_tolerance,
+                annotations=annotations
+            )
+        
+        if calls_chain['results']:
+            result['calls'] = filter_and_sort_options(
+                calls_chain['results'], 
+                price, 
+                is_put=False,
+                risk_tolerance=risk_tolerance,
+                annotations=annotations
+            )
+    except Exception as e:
+        result['error'] = f"❌ Error processing {ticker}: {str(e)}"
+        print(result['error'])
+    
+    return result
+
+def fetch_all(tickers: List[str], risk_tolerance: str = 'medium',
+              max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Scan several tickers concurrently on a thread pool.
+    
+    Prices for all tickers are prefetched with a single snapshot request.
+    Workers block on network I/O, so threads overlap the request latency;
+    they share _SESSION's connection pool and the global rate_limiter.
+    
+    Args:
+        tickers: Stock ticker symbols
+        risk_tolerance: Risk tolerance level ('low', 'medium', 'high')
+        max_workers: Number of worker threads (default: MAX_SCAN_WORKERS)
+        
+    Returns:
+        One scan_ticker result per ticker, in the order of tickers
+    """
+    if not tickers:
+        return []
+    
+    # One snapshot request for every price instead of one request per ticker
+    prices = get_stock_prices_batch(tickers)
+    
+    workers = max(1, min(max_workers or MAX_SCAN_WORKERS, len(tickers)))
+    results = [None] * len(tickers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(scan_ticker, ticker, risk_tolerance, prices.get(ticker)): i
+            for i, ticker in enumerate(tickers)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = {
+                    'ticker': tickers[i], 'price': None, 'expiration': TARGET_EXPIRATION,
+                    'puts': [], 'calls': [], 'error': f"❌ Error scanning {tickers[i]}: {str(e)}"
+                }
+            print(f"📦 [{done}/{len(tickers)}] Finished {tickers[i]}")
+    
+    return results
+
+def run(risk_tolerance: str = 'medium', max_workers: Optional[int] = None):
     """
     Main function to run the options scanner.
     
     Args:
         risk_tolerance: Risk tolerance level ('low', 'medium', 'high')
+        max_workers: Tickers scanned concurrently (default: MAX_SCAN_WORKERS)
     """
     # Declare global variables at the beginning of the function
     global TARGET_EXPIRATION, TICKERS, MIN_PREMIUM, MIN_DELTA, MAX_DELTA, MIN_OPEN_INTEREST
@@ -1460,16 +2285,20 @@ def run(risk_tolerance: str = 'medium'):
         print(f"⚠️  Invalid risk tolerance: {risk_tolerance}. Defaulting to 'medium'.")
         risk_tolerance = 'medium'
     
+    # One clock read for the banner, stats, report header and filename
+    start_time = datetime.now()
+    start_str = start_time.strftime('%Y-%m-%d %H:%M:%S')
+    
     print("🚀 Starting Polygon Options Scanner" + " " * 20)
-    print("="*80)
-    print(f"📅 Scan started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(BANNER_BAR)
+    print(f"📅 Scan started at: {start_str}")
     print(f"📊 Tickers to scan: {', '.join(TICKERS)}")
     print(f"🎯 Risk tolerance: {risk_tolerance.upper()}")
     print("-"*80 + "\n")
     
     # Initialize statistics
     stats = {
-        'start_time': datetime.now(),
+        'start_time': start_time,
         'tickers_processed': 0,
         'tickers_with_puts': 0,
         'tickers_with_calls': 0,
@@ -1480,331 +2309,205 @@ def run(risk_tolerance: str = 'medium'):
         'risk_tolerance': risk_tolerance
     }
     
-    # Initialize markdown content
-    md_content = [
-        "# 📊 Options Scan Report",
-        f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"**Tickers Scanned:** {len(TICKERS)}",
-        f"**Risk Tolerance:** {risk_tolerance.upper()}",
-        ""
-    ]
-    
-    # Check market status
-    try:
-        market_status = get_market_status()
-        md_content.append(f"**Market Status:** {market_status}")
-        if market_status != 'open':
-            md_content.append("⚠️ **Warning:** Market is not currently open. Data may be stale.")
-    except Exception as e:
-        md_content.append(f"⚠️ **Warning:** Could not determine market status: {str(e)}")
-    
-    md_content.extend(["", "## 📋 Scan Results", ""])
-    
     # Initialize lists to store all puts and calls for summary
     all_puts = []
     all_calls = []
+    underlying_prices = {}  # Prices of tickers with trades, handed to the trade sheet
     
     # Create output directory if it doesn't exist
     os.makedirs('output', exist_ok=True)
     
     # Generate output filename with timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = start_time.strftime('%Y%m%d_%H%M%S')
     output_file = f'output/trade_ideas_{risk_tolerance}_{timestamp}.md'
     
-    # Initialize stats
-    stats = {
-        'tickers_processed': 0,
-        'tickers_with_puts': 0,
-        'tickers_with_calls': 0,
-        'tickers_with_errors': 0,
-        'total_puts_found': 0,
-        'total_calls_found': 0,
-        'start_time': datetime.now(),
-        'errors': []
-    }
-    
-    all_puts = []
-    all_calls = []
-    
-    # Print header and get initial markdown content
-    md_content = print_header()
-    
-    print("="*80)
-    print(f"🚀 Starting options analysis for {len(TICKERS)} tickers")
-    print(f"⏰ {stats['start_time'].strftime('%Y-%m-%d %H:%M:%S')}")
-    print("="*80)
-    
-    # Add ticker list to markdown
-    md_content.extend([
-        "## 📋 Tickers Analyzed",
-        "",
-        "| Ticker | Status | Puts Found | Calls Found | Error |",
-        "|--------|--------|------------|-------------|-------|"
-    ])
-    
-    # Process each ticker with rate limiting
-    for i, ticker in enumerate(TICKERS, 1):
-        # Add random delay between tickers to avoid rate limiting
-        if i > 1:  # No delay before first ticker
-            delay = 0.5 + random.uniform(0, 1.0)  # 0.5-1.5 second delay
-            time.sleep(delay)
-        
-        ticker_start = datetime.now()
-        stats['tickers_processed'] += 1
-        ticker_status = ""
-        ticker_error = ""
-        puts_found = 0
-        calls_found = 0
-        price = None
-        options_chain = None
-        selected_expiration = TARGET_EXPIRATION  # Default to global target
+    # Stream the report straight to disk as it is produced
+    with open(output_file, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as report:
+        def emit(line):
+            report.write(line)
+            report.write('\n')
+        
+        # Print header and initial markdown content
+        write_lines(report, print_header(start_time))
+        
+        print(BANNER_BAR)
+        print(f"🚀 Starting options analysis for {len(TICKERS)} tickers")
+        print(f"⏰ {start_str}")
+        print(BANNER_BAR)
+        
+        # Add ticker list to markdown
+        write_lines(report, [
+            "## 📋 Tickers Analyzed",
+            "",
+            "| Ticker | Status | Puts Found | Calls Found | Error |",
+            "|--------|--------|------------|-------------|-------|"
+        ])
         
-        print(f"\n{'='*80}\n📊 [{i}/{len(TICKERS)}] Analyzing {ticker} (Risk: {risk_tolerance.upper()})")
-        print("-"*80)
+        # Scan tickers concurrently; results come back in TICKERS order
+        scan_results = fetch_all(TICKERS, risk_tolerance, max_workers=max_workers)
         
-        try:
-            # Get stock price with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    print(f"🔍 Fetching current price for {ticker} (attempt {attempt + 1}/{max_retries})...")
-                    price = get_stock_price(ticker)
-                    if not price or price <= 0:
-                        raise ValueError(f"Invalid price ${price:.2f} for {ticker}")
-                    print(f"✅ Current price: ${price:.2f}")
-                    break
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    print(f"⚠️  Error fetching price: {str(e)}. Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
+        for result in scan_results:
+            ticker = result['ticker']
+            stats['tickers_processed'] += 1
             
-            # Get available expirations and select the best one
-            try:
-                print("\n📅 Fetching available option expirations...")
-                expirations = get_available_expirations(ticker, price)
-                selected_expiration = select_best_expiration(expirations, min_dte=10, max_dte=45)
-                print(f"🎯 Selected expiration: {selected_expiration}")
-                
-                # Update the global TARGET_EXPIRATION for this ticker
-                TARGET_EXPIRATION = selected_expiration
-                
-            except Exception as e:
-                print(f"⚠️  Error selecting expiration date: {str(e)}")
-                print(f"⚠️  Using default expiration: {TARGET_EXPIRATION}")
+            if result['error']:
+                stats['errors'].append(result['error'])
+                emit(f"| {ticker} | ❌ Error | 0 | 0 | {result['error'][:50]}... |")
+                stats['tickers_with_errors'] += 1
+                continue
             
-            # ... (rest of the code remains the same)
-            # Get options chain with progress indication and error handling
-            print(f"\n🔍 Fetching options chain for {ticker} (Exp: {TARGET_EXPIRATION})...")
+            TARGET_EXPIRATION = result['expiration']
+            puts = result['puts']
+            calls = result['calls']
+            puts_found = len(puts)
+            calls_found = len(calls)
             
-            # First get puts
-            print(f"📉 Fetching PUT options...")
-            try:
-                puts_chain = get_options_chain(ticker, 'put', price)
-                if not puts_chain or 'results' not in puts_chain or not puts_chain['results']:
-                    print("⚠️  No PUT options data available")
-                    puts_chain = {'results': []}
-                else:
-                    print(f"✅ Found {len(puts_chain['results'])} PUT contracts")
-                    # Filter for selected expiration only
-                    puts_chain['results'] = [opt for opt in puts_chain['results'] 
-                                          if opt.get('expiration_date') == TARGET_EXPIRATION]
-                    print(f"   → {len(puts_chain['results'])} contracts for {TARGET_EXPIRATION}")
-            except Exception as e:
-                print(f"⚠️  Error fetching PUT options: {str(e)}")
-                puts_chain = {'results': []}
+            stats['total_puts_found'] += puts_found
+            stats['total_calls_found'] += calls_found
+            if puts_found > 0:
+                stats['tickers_with_puts'] += 1
+            if calls_found > 0:
+                stats['tickers_with_calls'] += 1
+            all_puts.extend(puts)
+            all_calls.extend(calls)
+            if (puts or calls) and result['price']:
+                underlying_prices[ticker] = result['price']
             
-            # Then get calls
-            print(f"📈 Fetching CALL options...")
-            try:
-                calls_chain = get_options_chain(ticker, 'call', price)
-                if not calls_chain or 'results' not in calls_chain or not calls_chain['results']:
-                    print("⚠️  No CALL options data available")
-                    calls_chain = {'results': []}
-                else:
-                    print(f"✅ Found {len(calls_chain['results'])} CALL contracts")
-                    # Filter for selected expiration only
-                    calls_chain['results'] = [opt for opt in calls_chain['results'] 
-                                           if opt.get('expiration_date') == TARGET_EXPIRATION]
-                    print(f"   → {len(calls_chain['results'])} contracts for {TARGET_EXPIRATION}")
-            except Exception as e:
-                print(f"⚠️  Error fetching CALL options: {str(e)}")
-                calls_chain = {'results': []}
+            if not puts and not calls:
+                ticker_status = "⚠️ No qualifying options"
+                print(f"{ticker}: {ticker_status}")
+            else:
+                ticker_status = "✅ Success"
             
-            # Combine the results
-            options_chain = {'results': []}
-            if puts_chain and 'results' in puts_chain:
-                options_chain['results'].extend(puts_chain['results'])
-            if calls_chain and 'results' in calls_chain:
-                options_chain['results'].extend(calls_chain['results'])
-                
-            if not options_chain['results']:
-                raise ValueError("No valid options found for either puts or calls")
-                
-            print(f"✅ Found {len(options_chain.get('results', []))} options contracts")
+            # Add ticker results to markdown
+            emit(f"| {ticker} | {ticker_status} | {puts_found} | {calls_found} |  |")
             
-            # Process puts and calls
-            print(f"📊 Processing options data for {ticker}...")
+            # Add PUT results
+            if puts:
+                write_lines(report, ["\n### 📉 PUT Options", *OPTION_TABLE_HEADER])
+                emit(format_option_rows(sorted(puts, key=BY_STRIKE)))
             
-            try:
-                # Process and filter options
-                if 'puts' in options_chain and options_chain['puts']:
-                    puts_filtered = filter_and_sort_options(
-                        options_chain['puts'], 
-                        price, 
-                        is_put=True,
-                        risk_tolerance=risk_tolerance
-                    )
-                    puts_found = len(puts_filtered)
-                    stats['total_puts_found'] += puts_found
-                    if puts_found > 0:
-                        stats['tickers_with_puts'] += 1
-                
-                    # Add to all_puts for summary
-                    for put in puts_filtered:
-                        put.update({
-                            'ticker': ticker,
-                            'current_price': price,
-                            'expiration': TARGET_EXPIRATION
-                        })
-                        all_puts.append(put)
+            # Add CALL results
+            if calls:
+                write_lines(report, ["\n### 📈 CALL Options", *OPTION_TABLE_HEADER])
+                emit(format_option_rows(sorted(calls, key=BY_STRIKE)))
             
-                # Process calls with risk tolerance
-                if 'calls' in options_chain and options_chain['calls']:
-                    calls_filtered = filter_and_sort_options(
-                        options_chain['calls'], 
-                        price, 
-                        is_put=False,
-                        risk_tolerance=risk_tolerance
-                    )
-                    calls_found = len(calls_filtered)
-                    stats['total_calls_found'] += calls_found
-                    if calls_found > 0:
-                        stats['tickers_with_calls'] += 1
-                    
-                    # Add to all_calls for summary
-                    for call in calls_filtered:
-                        call.update({
-                            'ticker': ticker,
-                            'current_price': price,
-                            'expiration': TARGET_EXPIRATION
-                        })
-                        all_calls.append(call)
-                
-                if not puts_filtered and not calls_filtered:
-                    ticker_status = "⚠️ No qualifying options"
-                    print(ticker_status)
-                else:
-                    ticker_status = "✅ Success"
-                
-                # Add ticker results to markdown
-                md_content.append(f"| {ticker} | {ticker_status} | {puts_found} | {calls_found} | {ticker_error[:50] + '...' if ticker_error else ''} |")
-                
-                # Add PUT results
-                if puts:
-                    md_content.extend([
-                        f"\n### 📉 PUT Options",
-                        "| Strike | Premium | Δ | Yield | Annualized | ROC | DTE | Prob ITM | R/R | OI | Volume |",
-                        "|--------|---------|--|-------|------------|-----|-----|----------|-----|----|--------|"
-                    ])
-                    for put in sorted(puts, key=lambda x: x.get('strike_price', 0)):
-                        md_content.append(
-                            f"| ${put.get('strike_price', 0):.2f} | "
-                            f"${put.get('mid_price', 0):.2f} | "
-                            f"{put.get('delta', 0):.2f} | "
-                            f"{put.get('premium_yield', 0):.1f}% | "
-                            f"{put.get('annualized_yield', 0):.1f}% | "
-                            f"{put.get('monthly_roc', 0):.1f}% | "
-                            f"{put.get('days_to_expiration', 0)} | "
-                            f"{put.get('probability_itm', 0):.1f}% | "
-                            f"1:{put.get('risk_reward_ratio', 0):.1f} | "
-                            f"{put.get('open_interest', 0):,} | "
-                            f"{put.get('volume', 0):,} |"
-                        )
-                
-                # Add CALL results
-                if calls:
-                    md_content.extend([
-                        f"\n### 📈 CALL Options",
-                        "| Strike | Premium | Δ | Yield | Annualized | ROC | DTE | Prob ITM | R/R | OI | Volume |",
-                        "|--------|---------|--|-------|------------|-----|-----|----------|-----|----|--------|"
-                    ])
-                    for call in sorted(calls, key=lambda x: x.get('strike_price', 0)):
-                        md_content.append(
-                            f"| ${call.get('strike_price', 0):.2f} | "
-                            f"${call.get('mid_price', 0):.2f} | "
-                            f"{call.get('delta', 0):.2f} | "
-                            f"{call.get('premium_yield', 0):.1f}% | "
-                            f"{call.get('annualized_yield', 0):.1f}% | "
-                            f"{call.get('monthly_roc', 0):.1f}% | "
-                            f"{call.get('days_to_expiration', 0)} | "
-                            f"{call.get('probability_itm', 0):.1f}% | "
-                            f"1:{call.get('risk_reward_ratio', 0):.1f} | "
-                            f"{call.get('open_interest', 0):,} | "
-                            f"{call.get('volume', 0):,} |"
-                        )
+            # Add separator between tickers
+            emit("\n---\n")
+        
+        # The trade sheet only needs the scan results, so build it in the
+        # background while the rest of this report is written. Leaving the
+        # pool block joins it, even if writing the report fails; console
+        # output waits until then so the sheet's messages do not interleave.
+        with ThreadPoolExecutor(max_workers=1) as sheet_pool:
+            sheet_future = None
+            if all_puts or all_calls:
+                # The sheet attaches simulation results to its trades, so it gets
+                # its own copies of the option dicts the report below reads
+                sheet_future = sheet_pool.submit(generate_trade_idea_sheet,
+                                                 [dict(opt) for opt in all_puts],
+                                                 [dict(opt) for opt in all_calls],
+                                                 underlying_prices=underlying_prices)
+            
+            # After processing all tickers, add summary section
+            end_time = stats['end_time'] = datetime.now()
+            total_runtime = end_time - start_time
+            
+            # Calculate success rate
+            success_rate = ((stats['tickers_processed'] - stats['tickers_with_errors']) / 
+                           stats['tickers_processed'] * 100) if stats['tickers_processed'] > 0 else 0
+            
+            # Add summary to markdown
+            write_lines(report, [
+                "\n## 📊 Scan Summary",
+                "### 📈 Statistics",
+                f"- **Total tickers processed:** {stats['tickers_processed']}",
+                f"- **Tickers with qualifying puts:** {stats['tickers_with_puts']} ({stats['tickers_with_puts']/stats['tickers_processed']*100:.1f}%)",
+                f"- **Tickers with qualifying calls:** {stats['tickers_with_calls']} ({stats['tickers_with_calls']/stats['tickers_processed']*100:.1f}%)",
+                f"- **Total puts found:** {stats['total_puts_found']}",
+                f"- **Total calls found:** {stats['total_calls_found']}",
+                f"- **Scan success rate:** {success_rate:.1f}%",
+                f"- **Tickers with errors:** {stats['tickers_with_errors']}",
+                f"- **Scan start time:** {start_str}",
+                f"- **Scan end time:** {end_time.strftime('%Y-%m-%d %H:%M:%S')}",
+                f"- **Total runtime:** {total_runtime}",
+                "",
+                "### ⚙️ Scan Parameters",
+                f"- **Target expiration date:** {TARGET_EXPIRATION}",
+                f"- **Delta range:** {MIN_DELTA:.2f} - {MAX_DELTA:.2f}",
+                f"- **Minimum premium:** ${MIN_PREMIUM:.2f}",
+                f"- **Minimum open interest:** {MIN_OPEN_INTEREST}",
+                f"- **Strike price range for puts:** {MIN_STRIKE_PCT*100:.1f}% - 100% of current price",
+                f"- **Strike price range for calls:** 100% - {MAX_STRIKE_PCT*100:.1f}% of current price",
+                "",
+                "### 🔍 Top Trades by Annualized Yield"
+            ])
+            
+            # Rank once; the console and the report both take from the same list
+            top_puts = heapq.nlargest(REPORT_TOP_TRADES, all_puts, key=BY_ANNUALIZED_YIELD)
+            top_calls = heapq.nlargest(REPORT_TOP_TRADES, all_calls, key=BY_ANNUALIZED_YIELD)
+            
+            # Add top puts with rationales
+            if all_puts:
+                write_lines(report, [
+                    "\n## 📉 Top Put Opportunities",
+                    "| Ticker | Strike | Premium | Yield | DTE | Δ | PoP | Play Type |",
+                    "|--------|--------|---------|-------|-----|---|-----|-----------|"
+                ])
+            
+                for put in top_puts:
+                    emit(TOP_OPPORTUNITY_ROW.format_map(ZeroDefaultDict(TOP_OPPORTUNITY_DEFAULTS, **put)))
                 
-                # Add separator between tickers
-                md_content.append("\n---\n")
+                    # Add rationale as collapsible section
+                    rationale = generate_rationale(put, is_put=True)
+                    emit(f"\n<details><summary>📝 <b>Trade Rationale</b></summary>\n\n{rationale}\n</details>\n")
+            
+            # Add top calls with rationales
+            if all_calls:
+                write_lines(report, [
+                    "\n## 📈 Top Call Opportunities",
+                    "| Ticker | Strike | Premium | Yield | DTE | Δ | PoP | Play Type |",
+                    "|--------|--------|---------|-------|-----|---|-----|-----------|"
+                ])
+            
+                for call in top_calls:
+                    emit(TOP_OPPORTUNITY_ROW.format_map(ZeroDefaultDict(TOP_OPPORTUNITY_DEFAULTS, **call)))
                 
-            except Exception as e:
-                error_msg = f"❌ Error processing {ticker}: {str(e)}"
-                print(error_msg)
-                stats['errors'].append(error_msg)
-                md_content.append(f"| {ticker} | ❌ Error | 0 | 0 | {str(e)[:50]}... |")
-                stats['tickers_with_errors'] += 1
-                continue
+                    # Add rationale as collapsible section
+                    rationale = generate_rationale(call, is_put=False)
+                    emit(f"\n<details><summary>📝 <b>Trade Rationale</b></summary>\n\n{rationale}\n</details>\n")
             
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.5)
+            # Add final summary statistics
+            stats['duration'] = total_runtime.total_seconds() / 60
             
-        except Exception as e:
-            error_msg = f"❌ Error fetching data for {ticker}: {str(e)}"
-            print(error_msg)
-            stats['errors'].append(error_msg)
-            md_content.append(f"| {ticker} | ❌ Error | 0 | 0 | {str(e)[:50]}... |")
-            stats['tickers_with_errors'] += 1
-            continue
-    
-    # After processing all tickers, add summary section
-    end_time = datetime.now()
-    total_runtime = end_time - stats['start_time']
-    
-    # Calculate success rate
-    success_rate = ((stats['tickers_processed'] - stats['tickers_with_errors']) / 
-                   stats['tickers_processed'] * 100) if stats['tickers_processed'] > 0 else 0
-    
-    # Add summary to markdown
-    md_content.extend([
-        "\n## 📊 Scan Summary",
-        "### 📈 Statistics",
-        f"- **Total tickers processed:** {stats['tickers_processed']}",
-        f"- **Tickers with qualifying puts:** {stats['tickers_with_puts']} ({stats['tickers_with_puts']/stats['tickers_processed']*100:.1f}%)",
-        f"- **Tickers with qualifying calls:** {stats['tickers_with_calls']} ({stats['tickers_with_calls']/stats['tickers_processed']*100:.1f}%)",
-        f"- **Total puts found:** {stats['total_puts_found']}",
-        f"- **Total calls found:** {stats['total_calls_found']}",
-        f"- **Scan success rate:** {success_rate:.1f}%",
-        f"- **Tickers with errors:** {stats['tickers_with_errors']}",
-        f"- **Scan start time:** {stats['start_time'].strftime('%Y-%m-%d %H:%M:%S')}",
-        f"- **Scan end time:** {end_time.strftime('%Y-%m-%d %H:%M:%S')}",
-        f"- **Total runtime:** {total_runtime}",
-        "",
-        "### ⚙️ Scan Parameters",
-        f"- **Target expiration date:** {TARGET_EXPIRATION}",
-        f"- **Delta range:** {MIN_DELTA:.2f} - {MAX_DELTA:.2f}",
-        f"- **Minimum premium:** ${MIN_PREMIUM:.2f}",
-        f"- **Minimum open interest:** {MIN_OPEN_INTEREST}",
-        f"- **Strike price range for puts:** {MIN_STRIKE_PCT*100:.1f}% - 100% of current price",
-        f"- **Strike price range for calls:** 100% - {MAX_STRIKE_PCT*100:.1f}% of current price",
-        "",
-        "### 🔍 Top Trades by Annualized Yield"
-    ])
+            write_lines(report, [
+                "\n## 📊 Final Summary",
+                f"- **Tickers Processed:** {stats['tickers_processed']}",
+                f"- **Tickers with Valid Puts:** {stats['tickers_with_puts']}",
+                f"- **Tickers with Valid Calls:** {stats['tickers_with_calls']}",
+                f"- **Total Puts Found:** {stats['total_puts_found']}",
+                f"- **Total Calls Found:** {stats['total_calls_found']}",
+                f"- **Tickers with Errors:** {stats['tickers_with_errors']}",
+                f"- **Total Runtime:** {stats['duration']:.1f} minutes",
+                ""
+            ])
+            
+            # Add any errors encountered
+            if stats['errors']:
+                write_lines(report, [
+                    "## ❌ Errors Encountered",
+                    "The following errors were encountered during processing:",
+                    '- ' + '\n- '.join(stats['errors'])
+                ])
+            
+            # Add footer
+            write_lines(report, [REPORT_FOOTER.format(generated=end_time)])
+            sync_report(report)
     
     # Print summary to console
-    print("\n" + "="*80)
+    print("\n" + BANNER_BAR)
     print("📊 SCAN COMPLETE - SUMMARY")
-    print("="*80)
+    print(BANNER_BAR)
     print(f"✅ Processed {stats['tickers_processed']} tickers in {total_runtime}")
     print(f"📊 Found {stats['total_puts_found']} puts and {stats['total_calls_found']} calls meeting criteria")
     print(f"📈 Success rate: {success_rate:.1f}%")
@@ -1823,215 +2526,31 @@ def run(risk_tolerance: str = 'medium'):
         print("\n🏆 Top Trades:")
         # Show top 3 puts and calls if available
         if all_puts:
-            print("\n📉 Top 3 Puts by Annualized Yield:")
-            for i, put in enumerate(sorted(all_puts, key=lambda x: x.get('annualized_yield', 0), reverse=True)[:3], 1):
-                print(f"   {i}. {put.get('ticker')} ${put.get('strike_price'):.2f} Put | "
-                      f"Premium: ${put.get('mid_price', 0):.2f} | "
-                      f"Yield: {put.get('annualized_yield', 0):.1f}% | "
-                      f"Δ {put.get('delta', 0):.2f} | "
-                      f"DTE: {put.get('days_to_expiration', 0)}")
+            print(f"\n📉 Top {CONSOLE_TOP_TRADES} Puts by Annualized Yield:")
+            for i, put in enumerate(top_puts[:CONSOLE_TOP_TRADES], 1):
+                print(TOP_TRADE_LINE.format_map(ZeroDefaultDict(put, idx=i, kind='Put')))
         
         if all_calls:
-            print("\n📈 Top 3 Calls by Annualized Yield:")
-            for i, call in enumerate(sorted(all_calls, key=lambda x: x.get('annualized_yield', 0), reverse=True)[:3], 1):
-                print(f"   {i}. {call.get('ticker')} ${call.get('strike_price'):.2f} Call | "
-                      f"Premium: ${call.get('mid_price', 0):.2f} | "
-                      f"Yield: {call.get('annualized_yield', 0):.1f}% | "
-                      f"Δ {call.get('delta', 0):.2f} | "
-                      f"DTE: {call.get('days_to_expiration', 0)}")
-    
-    print("\n" + "="*80)
-    
-    # Helper function to generate trade rationale
-    def generate_rationale(opt, is_put):
-        ticker = opt.get('ticker', 'UNKNOWN')
-        strike = opt.get('strike_price', 0)
-        current_price = opt.get('current_price', 0)
-        premium = opt.get('mid_price', 0)
-        dte = opt.get('days_to_expiration', 0)
-        delta = opt.get('delta', 0)
-        pop = opt.get('probability_itm', 0) / 100  # Convert back to decimal
-        
-        # Determine if ITM/OTM
-        if is_put:
-            moneyness = "ITM" if strike > current_price else "OTM"
-            breakeven = strike - premium
-            max_profit = premium
-            max_loss = strike - premium
-        else:  # call
-            moneyness = "ITM" if strike < current_price else "OTM"
-            breakeven = strike + premium
-            max_profit = "Unlimited" if is_put else "Unlimited"
-            max_loss = premium
-        
-        # Generate rationale based on option metrics
-        rationale = []
-        
-        # Play type and risk profile
-        rationale.append(f"**{opt.get('play_type', 'Trade')}** ({opt.get('risk_tolerance', 'MEDIUM')} risk): ")
-        
-        # Basic trade setup
-        if is_put:
-            rationale.append(f"Sell ${strike:.2f} put ({moneyness}) "
-                           f"for ${premium:.2f} premium, {dte} DTE.")
-        else:
-            rationale.append(f"Sell ${strike:.2f} call ({moneyness}) "
-                           f"for ${premium:.2f} premium, {dte} DTE.")
-        
-        # Key metrics
-        rationale.append(f"\n- **Probability of Profit (PoP):** {pop*100:.0f}%")
-        rationale.append(f"- **Annualized Yield:** {opt.get('annualized_yield', 0):.1f}%")
-        rationale.append(f"- **Delta:** {delta:.2f}")
-        rationale.append(f"- **Breakeven:** ${breakeven:.2f}")
-        
-        # Risk/Reward
-        rationale.append("\n**Risk/Reward:**")
-        rationale.append(f"- Max Profit: ${max_profit:.2f} per contract")
-        rationale.append(f"- Max Loss: ${max_loss:.2f} per contract" if isinstance(max_loss, (int, float)) else f"- Max Loss: {max_loss} (naked call)")
-        
-        # Liquidity note
-        if opt.get('liquidity_score', 0) < 20:
-            rationale.append("\n⚠️ **Liquidity Warning:** Low open interest/volume - consider smaller position size.")
-        
-        return "\n".join(rationale)
-    
-    # Add top puts with rationales
-    if all_puts:
-        md_content.extend([
-            "\n## 📉 Top Put Opportunities",
-            "| Ticker | Strike | Premium | Yield | DTE | Δ | PoP | Play Type |",
-            "|--------|--------|---------|-------|-----|---|-----|-----------|"
-        ])
-        
-        # Sort by yield descending and take top 10
-        top_puts = sorted(all_puts, key=lambda x: x.get('annualized_yield', 0), reverse=True)[:10]
-        for put in top_puts:
-            md_content.append(
-                f"| {put.get('ticker')} | "
-                f"${put.get('strike_price'):.2f} | "
-                f"${put.get('mid_price', 0):.2f} | "
-                f"{put.get('annualized_yield', 0):.1f}% | "
-                f"{put.get('days_to_expiration', 0)} | "
-                f"{put.get('delta', 0):.2f} | "
-                f"{put.get('probability_itm', 0):.0f}% | "
-                f"{put.get('play_type', 'N/A')} |"
-            )
-            
-            # Add rationale as collapsible section
-            rationale = generate_rationale(put, is_put=True)
-            md_content.append(f"\n<details><summary>📝 <b>Trade Rationale</b></summary>\n\n{rationale}\n</details>\n")
-    
-    # Add top calls with rationales
-    if all_calls:
-        md_content.extend([
-            "\n## 📈 Top Call Opportunities",
-            "| Ticker | Strike | Premium | Yield | DTE | Δ | PoP | Play Type |",
-            "|--------|--------|---------|-------|-----|---|-----|-----------|"
-        ])
-        
-        # Sort by yield descending and take top 10
-        top_calls = sorted(all_calls, key=lambda x: x.get('annualized_yield', 0), reverse=True)[:10]
-        for call in top_calls:
-            md_content.append(
-                f"| {call.get('ticker')} | "
-                f"${call.get('strike_price'):.2f} | "
-                f"${call.get('mid_price', 0):.2f} | "
-                f"{call.get('annualized_yield', 0):.1f}% | "
-                f"{call.get('days_to_expiration', 0)} | "
-                f"{call.get('delta', 0):.2f} | "
-                f"{call.get('probability_itm', 0):.0f}% | "
-                f"{call.get('play_type', 'N/A')} |"
-            )
-            
-            # Add rationale as collapsible section
-            rationale = generate_rationale(call, is_put=False)
-            md_content.append(f"\n<details><summary>📝 <b>Trade Rationale</b></summary>\n\n{rationale}\n</details>\n")
-    
-    # Add error section if any errors occurred
-    if stats['errors']:
-        md_content.extend([
-            "\n## ❌ Errors Encountered",
-            "The following errors were encountered during processing:",
-            ""
-        ])
-        
-        for error in stats['errors']:
-            md_content.append(f"- {error}")
+            print(f"\n📈 Top {CONSOLE_TOP_TRADES} Calls by Annualized Yield:")
+            for i, call in enumerate(top_calls[:CONSOLE_TOP_TRADES], 1):
+                print(TOP_TRADE_LINE.format_map(ZeroDefaultDict(call, idx=i, kind='Call')))
     
-    # Add footer
-    md_content.extend([
-        "",
-        "---",
-        f"Generated on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S %Z')}",
-        f"Total runtime: {datetime.now() - stats['start_time']}"
-    ])
-
-    # Save to file
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(md_content))
-        print(f"\n✅ Analysis complete! Results saved to {output_file}")
-        
-        # Generate trade idea sheet
-        trade_idea_file = generate_trade_idea_sheet(all_puts, all_calls)
-        if trade_idea_file:
-            print(f"📋 Trade idea sheet saved to {trade_idea_file}")
-            
-    except Exception as e:
-        print(f"❌ Error saving results: {str(e)}")
-    
-    # Add final summary statistics
-    stats['end_time'] = datetime.now()
-    stats['duration'] = (stats['end_time'] - stats['start_time']).total_seconds() / 60
-    
-    md_content.extend([
-        "\n## 📊 Final Summary",
-        f"- **Tickers Processed:** {stats['tickers_processed']}",
-        f"- **Tickers with Valid Puts:** {stats['tickers_with_puts']}",
-        f"- **Tickers with Valid Calls:** {stats['tickers_with_calls']}",
-        f"- **Total Puts Found:** {stats['total_puts_found']}",
-        f"- **Total Calls Found:** {stats['total_calls_found']}",
-        f"- **Tickers with Errors:** {stats['tickers_with_errors']}",
-        f"- **Total Runtime:** {stats['duration']:.1f} minutes",
-        ""
-    ])
+    print("\n" + BANNER_BAR)
     
-    # Add any errors encountered
-    if stats['errors']:
-        md_content.extend([
-            "## ❌ Errors Encountered",
-            "The following errors were encountered during processing:"
-        ])
-        for error in stats['errors']:
-            md_content.append(f"- {error}")
+    print(f"\n✅ Final analysis saved to {output_file}")
     
-    # Add footer
-    md_content.extend([
-        "",
-        "---",
-        f"Generated on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S %Z')}",
-        ""
-    ])
-    
-    # Save the final markdown file
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(md_content))
-        print(f"\n✅ Final analysis saved to {output_file}")
-    except Exception as e:
-        print(f"❌ Error saving final results: {str(e)}")
+    # The sheet finished when its pool closed; surface its result or error
+    trade_sheet_path = sheet_future.result() if sheet_future else None
+    trade_sheet_abs = os.path.abspath(trade_sheet_path) if trade_sheet_path else None
+    if trade_sheet_abs:
+        print(f"📊 Trade idea sheet generated: {trade_sheet_abs}")
     
-    # Generate trade idea sheet if we have valid options
-    if all_puts or all_calls:
-        trade_sheet_path = generate_trade_idea_sheet(all_puts, all_calls)
-        if trade_sheet_path:
-            print(f"📊 Trade idea sheet generated: {os.path.abspath(trade_sheet_path)}")
-    
-    print(f"\n{'='*80}\n✅ Analysis complete!")
-    print(f"📄 Report saved to: {os.path.abspath(output_file)}")
-    if 'trade_sheet_path' in locals() and trade_sheet_path:
-        print(f"📊 Trade ideas saved to: {os.path.abspath(trade_sheet_path)}")
-    print("="*80)
+    # Closing banner as one write
+    sys.stdout.write(RUN_COMPLETE_BANNER.format_map({
+        'bar': BANNER_BAR,
+        'report': os.path.abspath(output_file),
+        'trade_sheet': TRADE_SHEET_SAVED_LINE.format(trade_sheet_abs) if trade_sheet_abs else ''
+    }))
     
     return output_file
 
@@ -2051,6 +2570,12 @@ def parse_args():
                       help=f'Maximum delta (default: {DEFAULT_MAX_DELTA})')
     parser.add_argument('--min-oi', type=int, default=DEFAULT_MIN_OPEN_INTEREST,
                       help=f'Minimum open interest (default: {DEFAULT_MIN_OPEN_INTEREST})')
+    parser.add_argument('--workers', type=int, default=MAX_SCAN_WORKERS,
+                      help=f'Tickers scanned concurrently (default: {MAX_SCAN_WORKERS})')
+    parser.add_argument('--rate-limit', type=float, default=API_RATE_LIMIT,
+                      help=f'Polygon requests per second across all workers (default: {API_RATE_LIMIT:g})')
+    parser.add_argument('--durable', action='store_true',
+                      help='fsync each report once it is written')
     return parser.parse_args()
 
 def main():
@@ -2064,26 +2589,31 @@ def main():
             TICKERS = [t.upper() for t in args.tickers]
         
         # Update other globals from args
-        global MIN_PREMIUM, MIN_DELTA, MAX_DELTA, MIN_OPEN_INTEREST
+        global MIN_PREMIUM, MIN_DELTA, MAX_DELTA, MIN_OPEN_INTEREST, REPORT_FSYNC, rate_limiter
         MIN_PREMIUM = args.min_premium
         MIN_DELTA = args.min_delta
         MAX_DELTA = args.max_delta
         MIN_OPEN_INTEREST = args.min_oi
+        REPORT_FSYNC = args.durable
+        if args.rate_limit != rate_limiter.rps:
+            rate_limiter = RateLimiter(args.rate_limit)
         
         print(f"🔍 Starting scan with risk tolerance: {args.risk.upper()}")
         print(f"📊 Tickers: {', '.join(TICKERS) if args.tickers else 'Default list'}")
         print(f"⚙️  Parameters: Premium>${MIN_PREMIUM:.2f}, Δ={MIN_DELTA:.2f}-{MAX_DELTA:.2f}, OI>={MIN_OPEN_INTEREST}")
         
         # Run with specified risk tolerance
-        run(risk_tolerance=args.risk)
+        run(risk_tolerance=args.risk, max_workers=args.workers)
         
     except KeyboardInterrupt:
         print("\n⚠️  Scan interrupted by user")
-    except Exception as e:
-        print(f"\n❌ Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+
+def report_uncaught_exception(exc_type, exc, tb):
+    """sys.excepthook for the CLI: a one-line error summary, then the traceback."""
+    print(f"\n❌ Error: {exc}")
+    traceback.print_exception(exc_type, exc, tb)
 
 if __name__ == "__main__":
     import argparse
+    sys.excepthook = report_uncaught_exception
     main()
@@ -0,0 +1,760 @@
+"""Tests for the polygon_options_data scanner helpers."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import polygon_options_data as pod
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Keep API caches out of the working tree and independent between tests."""
+    monkeypatch.setattr(pod, 'file_cache', pod.FileCache(str(tmp_path / 'cache')))
+    for cached in (pod.get_market_status, pod.get_stock_price, pod.get_available_expirations,
+                   pod.get_options_chain):
+        cached.cache_clear()
+    # Chains are only cached while the market is closed; tests opt in to 'open'
+    monkeypatch.setattr(pod, 'get_market_status', lambda: 'closed')
+
+
+def test_trade_detail_template_defaults_missing_fields():
+    """Missing numeric fields render as zero and missing labels as N/A."""
+    block = pod.TRADE_DETAIL_TEMPLATE.format_map(
+        pod._trade_detail_context({'strike_price': 190.0}, 4, 'Call')
+    )
+    assert block.startswith("### 4. N/A - $190.00 Call")
+    assert "Expiration:  N/A (in 0 days)" in block
+    assert "Open Int:    0 | Volume: 0" in block
+
+
+def test_trade_detail_template_uses_simulation_results():
+    """Simulation metrics are read from the nested simulation dict."""
+    put = {
+        'ticker': 'AAPL',
+        'strike_price': 190.0,
+        'open_interest': 1500,
+        'simulation': {'max_drawdown': -3.25, 'probability_of_profit': 71.0},
+    }
+    block = pod.TRADE_DETAIL_TEMPLATE.format_map(pod._trade_detail_context(put, 1, 'Put'))
+    assert "### 1. AAPL - $190.00 Put" in block
+    assert "Open Int:    1,500" in block
+    assert "- Max Drawdown:   3.2%" in block
+    assert "- Prob. Profit:   71.0%" in block
+
+
+def test_generate_trade_idea_sheet_without_report(tmp_path):
+    """write_report=False skips the markdown file entirely."""
+    puts = [{'ticker': 'AAPL', 'strike_price': 190.0, 'underlying_price': 200.0}]
+    result = pod.generate_trade_idea_sheet(
+        puts, [], output_dir=str(tmp_path), simulate_forward=None, write_report=False
+    )
+    assert result is None
+    assert list(tmp_path.iterdir()) == []
+    assert 'simulation' not in puts[0]
+
+
+def test_generate_trade_idea_sheet_attaches_real_simulation(tmp_path, monkeypatch):
+    """Scanner output keyed by 'ticker' gets a real simulation, not an error entry."""
+    from datetime import date, timedelta
+    import trade_simulator
+    monkeypatch.setattr(trade_simulator.time, 'sleep', lambda _: None)
+    expiration = (date.today() + timedelta(days=30)).isoformat()
+    puts = [{'ticker': 'AAPL', 'option_type': 'put', 'strike_price': 190.0,
+             'expiration': expiration, 'mid_price': 2.5}]
+    empty = []
+    assert pod.simulate_recommended_trades(empty, {}) is empty
+
+    pod.generate_trade_idea_sheet(puts, [], output_dir=str(tmp_path), simulate_forward=True,
+                                  underlying_prices={'AAPL': 200.0}, write_report=False)
+    simulation = puts[0]['simulation']
+    assert 'error' not in simulation
+    assert simulation['symbol'] == 'AAPL'
+    assert simulation['breakeven'] == 187.5
+    assert simulation['max_profit'] == 250.0
+
+
+def test_generate_trade_idea_sheet_ranks_across_tickers(tmp_path):
+    """Trades arriving in ticker order are re-ranked by annualized yield."""
+    puts = [{'ticker': 'AAPL', 'strike_price': 190.0, 'annualized_yield': 12.0},
+            {'ticker': 'TSLA', 'strike_price': 240.0, 'annualized_yield': 48.0}]
+    path = pod.generate_trade_idea_sheet(puts, [], output_dir=str(tmp_path), simulate_forward=None)
+    text = Path(path).read_text(encoding='utf-8')
+    assert "### 1. TSLA - $240.00 Put" in text
+    assert text.index("| TSLA |") < text.index("| AAPL |")
+
+
+def test_format_trade_sheet_rows_renders_simulation_and_tags():
+    """Rows show the simulation columns and tags, with missing fields as 0."""
+    put = {'ticker': 'AAPL', 'underlying_price': 200.0, 'strike_price': 190.0, 'mid_price': 2.5,
+           'premium_yield': 3.5, 'annualized_yield': 42.0, 'days_to_expiration': 30, 'delta': -0.3,
+           'simulation': {'probability_of_profit': 80.0, 'realized_yield': 1.2, 'max_drawdown': -4.0}}
+    rows = pod.format_trade_sheet_rows([put, {}], high_yield_pct=3.0)
+    assert rows[0] == ("| AAPL | $200.00 | $190.00 | $2.50 | 3.5% | 42.0% | 30 | -0.30 | "
+                       "80.0% | 1.2% | 4.0% | 💰 High Yield 🎯 High Prob |")
+    assert rows[1] == "| N/A | $0.00 | $0.00 | $0.00 | 0.0% | 0.0% | 0 | 0.00 | 0.0% | 0.0% | 0.0% |  |"
+
+
+def test_top_k_indices_keeps_tie_order():
+    """Scores are ranked best first and tied rows keep their input order."""
+    import numpy as np
+    scores = np.array([1.0, 3.0, 4.0, 2.0, 3.0])
+    assert pod.top_k_indices(scores, 3).tolist() == [2, 1, 4]
+    assert pod.top_k_indices(scores, 10).tolist() == [2, 1, 4, 3, 0]
+    assert pod.top_k_indices(scores, 0).size == 0
+    # Ties at the cut-off keep the earliest rows
+    assert pod.top_k_indices(np.array([5.0, 3.0, 3.0, 3.0, 1.0]), 2).tolist() == [0, 1]
+    wide = np.zeros(1000)
+    wide[[999, 500]] = 1.0
+    wide[3] = np.nan
+    assert pod.top_k_indices(wide, 5).tolist() == [500, 999, 0, 1, 2]
+
+
+def _make_put(strike, mid, delta=-0.6, oi=500, volume=200, dte=30):
+    return {
+        'strike_price': strike,
+        'mid_price': mid,
+        'bid': mid - 0.05,
+        'ask': mid + 0.05,
+        'delta': delta,
+        'days_to_expiration': dte,
+        'open_interest': oi,
+        'volume': volume,
+    }
+
+
+def test_filter_and_sort_options_ranks_by_annualized_yield(monkeypatch, capsys):
+    """Puts that pass the filters come back ranked by annualized yield."""
+    monkeypatch.setattr(pod, 'MAX_DELTA', 0.9)
+    puts = [
+        _make_put(95.0, 1.00),
+        _make_put(97.0, 2.00),
+        _make_put(96.0, 1.50, oi=10),  # rejected: open interest too low
+    ]
+    result = pod.filter_and_sort_options(puts, 100.0, is_put=True, risk_tolerance='medium')
+    assert [opt['strike_price'] for opt in result] == [97.0, 95.0]
+    assert result[0]['annualized_yield'] == pytest.approx(2.0 / 97.0 * 365 / 30 * 100)
+    assert result[0]['monthly_roc'] == pytest.approx(2.0 / 97.0 * 100)
+    assert result[0]['break_even'] == pytest.approx(95.0)
+    assert result[0]['play_type'] == pod.RISK_PARAMS_PUT['medium']['tag']
+    assert "Filtered 2/3; rejected: delta=0 premium=0 OI=1 strike=0 spread=0" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('risk, limit_pct', [('low', 15.0), ('medium', 30.0), ('high', 50.0)])
+def test_filter_and_sort_options_spread_limit_follows_risk(monkeypatch, capsys, risk, limit_pct):
+    """The bid-ask spread cut-off is the risk level's spread_max, as the header prints."""
+    monkeypatch.setattr(pod, 'MAX_DELTA', 0.9)
+    monkeypatch.setitem(pod.RISK_PARAMS_PUT[risk], 'pop_min', 0.0)
+    inside, outside = _make_put(97.0, 2.00), _make_put(96.0, 2.00)
+    for opt, pct in ((inside, limit_pct - 1), (outside, limit_pct + 1)):
+        opt['bid'], opt['ask'] = 2.0 - pct / 100, 2.0 + pct / 100
+    result = pod.filter_and_sort_options([inside, outside], 100.0, is_put=True, risk_tolerance=risk)
+    assert [opt['strike_price'] for opt in result] == [97.0]
+    assert f"Max bid-ask spread: {limit_pct:.0f}%" in capsys.readouterr().out
+
+
+def test_filter_and_sort_options_ranks_by_configured_metric(monkeypatch):
+    """TRADE_RANK_METRIC picks the score column, e.g. annualized ROC for calls."""
+    monkeypatch.setattr(pod, 'MAX_DELTA', 0.9)
+    monkeypatch.setattr(pod, 'TRADE_RANK_METRIC', 'annualized_roc')
+    calls = [_make_put(104.0, 1.00, dte=10), _make_put(103.0, 2.00, dte=40)]
+    result = pod.filter_and_sort_options(calls, 100.0, is_put=False, risk_tolerance='medium')
+    assert [opt['strike_price'] for opt in result] == [104.0, 103.0]
+    assert result[0]['annualized_roc'] == pytest.approx(1.0 / 100.0 * 100 * 365 / 10)
+
+
+def test_generate_trade_idea_sheet_writes_report(tmp_path):
+    """The report contains the detail blocks and tables, and is rebuilt cleanly on reuse."""
+    puts = [{'ticker': 'AAPL', 'strike_price': 190.0, 'underlying_price': 200.0,
+             'simulation': {'probability_of_profit': 80.0}}]
+    calls = [{'ticker': 'MSFT', 'strike_price': 420.0, 'underlying_price': 400.0,
+              'simulation': {}}]
+    first = pod.generate_trade_idea_sheet(puts, calls, output_dir=str(tmp_path), simulate_forward=True)
+    text = Path(first).read_text(encoding='utf-8')
+    assert text.startswith("# 📊 Daily Options Trade Report")
+    assert "### 1. AAPL - $190.00 Put" in text
+    assert "### 4. MSFT - $420.00 Call" in text
+    assert "| AAPL | $200.00 | $190.00 |" in text
+    assert "🎯 High Prob" in text
+
+    second = pod.generate_trade_idea_sheet([], calls, output_dir=str(tmp_path / 'again'), simulate_forward=True)
+    assert "AAPL" not in Path(second).read_text(encoding='utf-8')
+
+
+def test_reports_short_circuit_when_empty(tmp_path, monkeypatch):
+    """No file is written when there are no puts or calls."""
+    monkeypatch.chdir(tmp_path)
+    assert pod.generate_trade_idea_sheet([], [], output_dir=str(tmp_path / 'out')) is None
+    assert pod.save_to_markdown('AAPL', 200.0) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_scan_ticker_passes_expiration_explicitly(monkeypatch):
+    """scan_ticker threads its chosen expiration through instead of the global."""
+    requested = []
+
+    def fake_chain(ticker, option_type, price, expiration=None):
+        requested.append((option_type, expiration))
+        opt = _make_put(97.0, 2.00)
+        opt['expiration_date'] = expiration
+        return {'results': [opt]} if option_type == 'put' else {'results': []}
+
+    monkeypatch.setattr(pod, 'MAX_DELTA', 0.9)
+    monkeypatch.setattr(pod, 'get_stock_price', lambda ticker: 100.0)
+    monkeypatch.setattr(pod, 'get_available_expirations', lambda ticker, price: ['2030-01-18'])
+    monkeypatch.setattr(pod, 'select_best_expiration', lambda exps, **kw: exps[0])
+    monkeypatch.setattr(pod, 'get_options_chain', fake_chain)
+
+    result = pod.scan_ticker('AAPL')
+    assert result['error'] is None
+    assert sorted(requested) == [('call', '2030-01-18'), ('put', '2030-01-18')]
+    assert [p['ticker'] for p in result['puts']] == ['AAPL']
+    assert result['puts'][0]['expiration'] == '2030-01-18'
+    assert result['calls'] == []
+
+
+def test_ttl_cache_expires_and_skips_failures(monkeypatch):
+    """Results are reused until the TTL lapses; uncacheable results are refetched."""
+    clock = [100.0]
+    monkeypatch.setattr(pod.time, 'monotonic', lambda: clock[0])
+    calls = []
+
+    @pod.ttl_cache(ttl_seconds=60)
+    def lookup(ticker):
+        calls.append(ticker)
+        return None if ticker == 'BAD' else len(calls)
+
+    assert lookup('AAPL') == 1
+    assert lookup('AAPL') == 1
+    clock[0] += 61
+    assert lookup('AAPL') == 2
+    assert lookup('BAD') is None and lookup('BAD') is None
+    assert calls == ['AAPL', 'AAPL', 'BAD', 'BAD']
+
+
+def test_rate_limiter_only_blocks_when_bucket_is_empty(monkeypatch):
+    """A full bucket serves a burst without sleeping, then paces at rps."""
+    clock = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(pod.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(pod.time, 'sleep', fake_sleep)
+
+    limiter = pod.RateLimiter(rps=2)
+    for _ in range(3):
+        limiter.acquire()
+    assert sleeps == [pytest.approx(0.5)]
+
+    limiter.pause(3)
+    limiter.acquire()
+    assert sleeps[-1] == pytest.approx(3.0)
+
+
+def test_rate_limiter_follows_remaining_header(monkeypatch):
+    """A low remaining budget from Polygon drains the bucket before a 429."""
+    clock = [0.0]
+    sleeps = []
+    monkeypatch.setattr(pod.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(pod.time, 'sleep', sleeps.append)
+
+    limiter = pod.RateLimiter(rps=5)
+    limiter.update_from_headers({'Content-Type': 'application/json'})
+    assert limiter.tokens == 5
+    limiter.update_from_headers({'X-RateLimit-Requests-Remaining': '0'})
+    limiter.acquire()
+    assert sleeps == [pytest.approx(0.2)]
+
+
+def test_rate_limit_flag_rebuilds_shared_limiter(monkeypatch):
+    """--rate-limit replaces the shared bucket before any request goes out."""
+    import argparse
+    seen = []
+    monkeypatch.setattr(pod, 'argparse', argparse, raising=False)  # imported under __main__
+    monkeypatch.setattr(pod.sys, 'argv', ['polygon_options_data.py', '--rate-limit', '50'])
+    monkeypatch.setattr(pod, 'rate_limiter', pod.RateLimiter(pod.API_RATE_LIMIT))
+    monkeypatch.setattr(pod, 'run', lambda **kwargs: seen.append(pod.rate_limiter.rps))
+    pod.main()
+    assert seen == [50.0]
+
+
+def test_session_retries_429_through_rate_limiter(monkeypatch):
+    """A real 429 reaches the hook, pauses the limiter and is resent through it."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    statuses = [429, 429, 200]
+    served = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = statuses[len(served)] if len(served) < len(statuses) else 429
+            served.append(status)
+            body = b'{"ok": true}'
+            self.send_response(status)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class CountingLimiter(pod.RateLimiter):
+        def __init__(self):
+            super().__init__(rps=1000)
+            self.acquired = 0
+            self.paused = []
+
+        def acquire(self):
+            self.acquired += 1
+            super().acquire()
+
+        def pause(self, seconds):
+            self.paused.append(seconds)
+            super().pause(seconds)
+
+    limiter = CountingLimiter()
+    monkeypatch.setattr(pod, 'rate_limiter', limiter)
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/marketstatus/now"
+    try:
+        response = pod._SESSION.get(url, timeout=5)
+        assert response.status_code == 200 and response.json() == {'ok': True}
+        assert served == [429, 429, 200]
+        assert limiter.paused == [0.0, 0.0] and limiter.acquired == 2
+
+        # A 429 that outlasts the retries still reaches raise_for_status()
+        served.clear()
+        statuses[:] = []
+        response = pod._SESSION.get(url, timeout=5)
+        assert response.status_code == 429
+        assert len(served) == 1 + pod.RATE_LIMIT_RETRIES
+        with pytest.raises(pod.requests.exceptions.HTTPError):
+            response.raise_for_status()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_run_writes_single_report(tmp_path, monkeypatch):
+    """run() aggregates scan results into one report with one summary."""
+    def fake_scan(ticker, risk_tolerance='medium', price=None):
+        if ticker == 'BAD':
+            return {'ticker': ticker, 'price': None, 'expiration': None,
+                    'puts': [], 'calls': [], 'error': '❌ Error fetching data for BAD: boom'}
+        put = _make_put(97.0, 2.00)
+        put.update(ticker=ticker, annualized_yield=25.0, expiration='2030-01-18')
+        return {'ticker': ticker, 'price': 100.0, 'expiration': '2030-01-18',
+                'puts': [put], 'calls': [], 'error': None}
+
+    sheets = []
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pod, 'TICKERS', ['AAPL', 'BAD'])
+    monkeypatch.setattr(pod, 'scan_ticker', fake_scan)
+    monkeypatch.setattr(pod, 'get_stock_prices_batch', lambda tickers: {})
+    monkeypatch.setattr(pod, 'get_market_status', lambda: 'open')
+    monkeypatch.setattr(pod, 'generate_trade_idea_sheet',
+                        lambda puts, calls, underlying_prices: sheets.append((puts, calls, underlying_prices)))
+
+    output_file = pod.run('medium')
+    text = Path(output_file).read_text(encoding='utf-8')
+    assert text.count("## ❌ Errors Encountered") == 1
+    assert text.count("Generated on") == 1
+    assert "| AAPL | ✅ Success | 1 | 0 |" in text
+    assert "| BAD | ❌ Error |" in text
+    assert "| AAPL | $97.00 | $2.00 | 25.0% | 30 | -0.60 | 0% | N/A |" in text
+    assert len(sheets) == 1 and [p['ticker'] for p in sheets[0][0]] == ['AAPL']
+    assert sheets[0][2] == {'AAPL': 100.0}
+
+
+def test_run_joins_real_trade_sheet_before_console_summary(tmp_path, monkeypatch, capsys):
+    """The real trade sheet is written and its output precedes the summary, even on failure."""
+    scanned = []
+
+    def fake_scan(ticker, risk_tolerance='medium', price=None):
+        put = _make_put(97.0, 2.00)
+        put.update(ticker=ticker, annualized_yield=25.0, expiration='2030-01-18',
+                   underlying_price=100.0)
+        scanned.append(put)
+        return {'ticker': ticker, 'price': 100.0, 'expiration': '2030-01-18',
+                'puts': [put], 'calls': [], 'error': None}
+
+    def fake_simulate(trades, underlying_prices, simulate_forward=True):
+        print("simulating trades")
+        assert not any(trade is opt for trade in trades for opt in scanned)
+        for trade in trades:
+            trade['simulation'] = {}
+        return trades
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pod, 'TICKERS', ['AAPL'])
+    monkeypatch.setattr(pod, 'scan_ticker', fake_scan)
+    monkeypatch.setattr(pod, 'get_stock_prices_batch', lambda tickers: {})
+    monkeypatch.setattr(pod, 'get_market_status', lambda: 'open')
+    monkeypatch.setattr(pod, 'simulate_recommended_trades', fake_simulate)
+
+    pod.run('medium')
+    out = capsys.readouterr().out
+    sheets = list((tmp_path / 'output').glob('trade_ideas_2*.md'))
+    assert len(sheets) == 1
+    assert "### 1. AAPL - $97.00 Put" in sheets[0].read_text(encoding='utf-8')
+    assert out.index("simulating trades") < out.index("SCAN COMPLETE")
+    assert out.index("✅ Report generated") < out.index("SCAN COMPLETE")
+    assert f"📊 Trade ideas saved to: {sheets[0]}" in out
+
+    # The sheet simulated its own copies; the report's dicts were never touched
+    assert "'simulation'" not in repr(scanned)
+
+    # A failure while writing the report still waits for the sheet
+    for sheet in sheets:
+        sheet.unlink()
+
+    def broken_rationale(opt, is_put):
+        raise RuntimeError("rationale failed")
+
+    monkeypatch.setattr(pod, 'generate_rationale', broken_rationale)
+    with pytest.raises(RuntimeError, match="rationale failed"):
+        pod.run('medium')
+    assert len(list((tmp_path / 'output').glob('trade_ideas_2*.md'))) == 1
+
+
+def test_select_best_expiration_prefers_target_dte():
+    """The expiration nearest the middle of the DTE window wins; bad dates are skipped."""
+    from datetime import date, timedelta
+
+    def ymd(days):
+        return (date.today() + timedelta(days=days)).isoformat()
+
+    assert pod.select_best_expiration([ymd(5), ymd(20), ymd(30), 'bogus']) == ymd(30)
+    assert pod.select_best_expiration([ymd(3), ymd(90), 'bogus']) == ymd(3)
+
+
+def test_score_chain_matches_numpy_fallback():
+    """The (possibly JIT-compiled) scorer agrees with the NumPy implementation."""
+    import numpy as np
+
+    arrays = (
+        np.array([95.0, 100.0, 0.0]),   # strike
+        np.array([2.0, 1.0, 1.0]),      # quoted mid
+        np.array([1.9, 0.0, 0.9]),      # bid
+        np.array([2.1, 1.2, 1.1]),      # ask
+        np.array([1.8, 0.8, 0.0]),      # last trade
+        np.array([30.0, 10.0, 5.0]),    # days to expiration
+        np.array([95.0, 100.0, 0.0]),   # capital (the strike, for puts)
+    )
+    expected = pod._score_chain_numpy(*arrays)
+    for got, want in zip(pod.score_chain(*arrays), expected):
+        np.testing.assert_allclose(got, want)
+    assert expected[0][1] == 0.8  # one-sided quote falls back to last trade
+    assert expected[2][2] == 0.0  # zero strike yields nothing
+
+
+def test_score_chain_matches_numpy_fallback_on_missing_quotes():
+    """NaN from missing quotes compares false in the kernel exactly as in NumPy."""
+    import numpy as np
+
+    nan = np.nan
+    arrays = (
+        np.array([95.0, nan, 100.0, 90.0]),  # strike
+        np.array([nan, 1.0, 2.0, nan]),      # quoted mid
+        np.array([1.9, 0.9, nan, 0.0]),      # bid
+        np.array([2.1, 1.1, 2.2, 0.0]),      # ask
+        np.array([1.8, 0.0, nan, nan]),      # last trade
+        np.array([30.0, 10.0, 5.0, 7.0]),    # days to expiration
+        np.array([95.0, nan, 100.0, 90.0]),  # capital
+    )
+    expected = pod._score_chain_numpy(*arrays)
+    for got, want in zip(pod.score_chain(*arrays), expected):
+        np.testing.assert_allclose(got, want, equal_nan=True)
+    spread_pct = pod.score_chain(*arrays)[1]
+    assert spread_pct[0] == 100.0 and spread_pct[3] == 100.0  # no usable mid is never 'tight'
+
+
+def test_format_option_rows_defaults_missing_fields():
+    """Each option becomes one table row; absent metrics render as zero."""
+    put = _make_put(97.0, 2.00)
+    put['annualized_yield'] = 25.0
+    rows = pod.format_option_rows([put, {'strike_price': 90.0}]).split("\n")
+    assert rows[0] == "| $97.00 | $2.00 | -0.60 | 0.0% | 25.0% | 0.0% | 30 | 0.0% | 1:0.0 | 500 | 200 |"
+    assert rows[1].startswith("| $90.00 | $0.00 |")
+
+
+def test_generate_rationale_reflects_current_fields():
+    """Calls render without error and the text follows later field changes."""
+    call = {'ticker': 'MSFT', 'strike_price': 420.0, 'current_price': 400.0, 'mid_price': 3.0,
+            'days_to_expiration': 30, 'delta': 0.3, 'liquidity_score': 50}
+    text = pod.generate_rationale(call, is_put=False)
+    assert "Sell $420.00 call (OTM)" in text
+    assert "- Max Profit: $3.00 per contract" in text
+    assert "- Max Loss: Unlimited (naked call)" in text
+    call['mid_price'] = 99.0
+    assert "- Max Profit: $99.00 per contract" in pod.generate_rationale(call, is_put=False)
+    assert set(call) == {'ticker', 'strike_price', 'current_price', 'mid_price',
+                         'days_to_expiration', 'delta', 'liquidity_score'}
+
+
+def test_save_to_markdown_lists_best_yields_first(tmp_path):
+    """Puts are tabulated by descending yield and the empty calls note is kept."""
+    puts = [_make_put(95.0, 1.00), _make_put(97.0, 2.00)]
+    puts[0]['annualized_yield'], puts[1]['annualized_yield'] = 10.0, 30.0
+    path = pod.save_to_markdown('AAPL', 100.0, puts=puts, filename=str(tmp_path / 'a.md'))
+    text = Path(path).read_text(encoding='utf-8')
+    assert text.startswith("# 📊 Options Analysis: AAPL\n")
+    assert text.index("| $97.00 |") < text.index("| $95.00 |")
+    assert "No qualifying call options found." in text
+    assert text.endswith("*")
+
+
+def test_save_to_markdown_fsyncs_only_when_durable(tmp_path, monkeypatch):
+    """Reports are fsynced once, and only with REPORT_FSYNC enabled."""
+    synced = []
+    puts = [_make_put(97.0, 2.00)]
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pod.os, 'fsync', synced.append)
+    pod.save_to_markdown('AAPL', 100.0, puts=puts, filename='fast.md')
+    assert synced == []
+    monkeypatch.setattr(pod, 'REPORT_FSYNC', True)
+    path = pod.save_to_markdown('AAPL', 100.0, puts=puts, filename='durable.md')
+    assert len(synced) == 1
+    assert Path(path).read_text(encoding='utf-8').startswith("# 📊 Options Analysis: AAPL")
+
+
+class _FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.content = pod.json.dumps(payload).encode()
+        self.elapsed = pod.timedelta(seconds=0.01)
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise pod.requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+
+class _FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        return self.responses.pop(0)
+
+
+def test_get_options_chain_keeps_strikes_in_range(monkeypatch):
+    """One request per chain; only strikes inside the put window are returned, slimmed."""
+    session = _FakeSession(_FakeResponse({'results': [
+        {'strike_price': 80.0, 'expiration_date': '2030-01-18'},
+        {'strike_price': 95.0, 'expiration_date': '2030-01-18', 'cfi': 'OPASPS',
+         'shares_per_contract': 100, 'greeks': {'delta': -0.3}},
+        {'strike_price': 105.0, 'expiration_date': '2030-01-18'},
+    ]}))
+    monkeypatch.setattr(pod, '_SESSION', session)
+    monkeypatch.setattr(pod, 'rate_limiter', pod.RateLimiter(rps=1000))
+
+    chain = pod.get_options_chain('AAPL', 'put', 100.0, expiration='2030-01-18')
+    assert [opt['strike_price'] for opt in chain['results']] == [95.0]
+    assert chain['results'][0]['ticker'] == 'AAPL'
+    assert chain['results'][0]['delta'] == -0.3
+    assert 'cfi' not in chain['results'][0] and 'shares_per_contract' not in chain['results'][0]
+    assert session.calls[0][1]['expiration_date'] == '2030-01-18'
+
+
+def test_get_options_chain_follows_next_url(monkeypatch):
+    """Later pages are fetched through next_url and merged into one chain."""
+    next_url = 'https://api.polygon.io/v3/reference/options/contracts?cursor=abc'
+    session = _FakeSession(
+        _FakeResponse({'results': [{'strike_price': 95.0, 'expiration_date': '2030-01-18'}],
+                       'next_url': next_url}),
+        _FakeResponse({'results': [{'strike_price': 96.0, 'expiration_date': '2030-01-18'}]}),
+    )
+    monkeypatch.setattr(pod, '_SESSION', session)
+    monkeypatch.setattr(pod, 'rate_limiter', pod.RateLimiter(rps=1000))
+
+    chain = pod.get_options_chain('AAPL', 'put', 100.0, expiration='2030-01-18')
+    assert [opt['strike_price'] for opt in chain['results']] == [95.0, 96.0]
+    assert session.calls[1] == (next_url, {'apiKey': pod.API_KEY})
+
+
+def test_get_options_chain_reports_http_errors_as_empty(monkeypatch):
+    """A failed request yields an empty chain instead of raising."""
+    monkeypatch.setattr(pod, '_SESSION', _FakeSession(_FakeResponse({}, status_code=500)))
+    monkeypatch.setattr(pod, 'rate_limiter', pod.RateLimiter(rps=1000))
+    assert pod.get_options_chain('AAPL', 'call', 100.0) == {'results': []}
+
+
+def test_fetch_all_preserves_ticker_order(monkeypatch):
+    """Results line up with the input tickers, and worker crashes become errors."""
+    def fake_scan(ticker, risk_tolerance='medium', price=None):
+        if ticker == 'BOOM':
+            raise RuntimeError('boom')
+        return {'ticker': ticker, 'price': price, 'puts': [], 'calls': [], 'error': None}
+
+    monkeypatch.setattr(pod, 'scan_ticker', fake_scan)
+    monkeypatch.setattr(pod, 'get_stock_prices_batch', lambda tickers: {'AAPL': 190.0})
+    results = pod.fetch_all(['AAPL', 'BOOM', 'MSFT'], max_workers=3)
+    assert [r['ticker'] for r in results] == ['AAPL', 'BOOM', 'MSFT']
+    assert [results[0]['price'], results[2]['price']] == [190.0, None]
+    assert results[1]['error'] == "❌ Error scanning BOOM: boom"
+    assert pod.fetch_all([]) == []
+
+
+def test_get_stock_prices_batch_single_request(monkeypatch):
+    """All prices come from one snapshot call, falling back to the previous close."""
+    session = _FakeSession(_FakeResponse({'tickers': [
+        {'ticker': 'AAPL', 'day': {'c': 190.5}, 'prevDay': {'c': 189.0}},
+        {'ticker': 'MSFT', 'day': {'c': 0}, 'prevDay': {'c': 410.0}},
+        {'ticker': 'DEAD', 'day': {}, 'prevDay': {}},
+    ]}))
+    monkeypatch.setattr(pod, '_SESSION', session)
+    monkeypatch.setattr(pod, 'rate_limiter', pod.RateLimiter(rps=1000))
+
+    prices = pod.get_stock_prices_batch(['AAPL', 'MSFT', 'DEAD'])
+    assert prices == {'AAPL': 190.5, 'MSFT': 410.0}
+    assert len(session.calls) == 1
+    assert session.calls[0][1]['tickers'] == 'AAPL,MSFT,DEAD'
+
+
+def test_file_cache_round_trip_and_ttl(tmp_path, monkeypatch):
+    """Entries are read back until they are older than the reader's TTL."""
+    cache = pod.FileCache(str(tmp_path / 'fc'))
+    assert cache.get(('AAPL', 'put'), ttl=60) is None
+    cache.set(('AAPL', 'put'), {'results': [{'strike_price': 95.0}]})
+    assert cache.get(('AAPL', 'put'), ttl=60) == {'results': [{'strike_price': 95.0}]}
+    now = pod.time.time()
+    monkeypatch.setattr(pod.time, 'time', lambda: now + 120)
+    assert cache.get(('AAPL', 'put'), ttl=60) is None
+    assert not Path(cache._path(('AAPL', 'put'))).exists()  # expired entries are evicted
+
+
+@pytest.mark.parametrize('raw', [b'[1, 2]', b'"stale"', b'{"data": 1}', b'{"ts": "x", "data": 1}'])
+def test_file_cache_treats_malformed_entries_as_misses(tmp_path, raw):
+    """Files that are valid JSON but not a {'ts', 'data'} entry are ignored."""
+    cache = pod.FileCache(str(tmp_path / 'fc'))
+    cache.set(('AAPL', 'put'), 'placeholder')
+    Path(cache._path(('AAPL', 'put'))).write_bytes(raw)
+    assert cache.get(('AAPL', 'put'), ttl=60) is None
+
+
+def test_get_options_chain_served_from_disk_cache(monkeypatch):
+    """A warm disk cache skips the network entirely."""
+    session = _FakeSession(_FakeResponse({'results': [{'strike_price': 95.0, 'expiration_date': '2030-01-18'}]}))
+    monkeypatch.setattr(pod, '_SESSION', session)
+    monkeypatch.setattr(pod, 'rate_limiter', pod.RateLimiter(rps=1000))
+
+    first = pod.get_options_chain('AAPL', 'put', 100.0, expiration='2030-01-18')
+    pod.get_options_chain.cache_clear()  # drop the in-memory copy, keep the file
+    second = pod.get_options_chain('AAPL', 'put', 100.0, expiration='2030-01-18')
+    assert len(session.calls) == 1
+    assert second == first
+
+    # The disk hit is promoted into memory, so the next call never reads the file
+    monkeypatch.setattr(pod.file_cache, '_entry', lambda *a: pytest.fail('disk read on a warm memory cache'))
+    assert pod.get_options_chain('AAPL', 'put', 100.0, expiration='2030-01-18') == first
+
+
+def test_get_options_chain_skips_caches_while_market_open(monkeypatch, tmp_path):
+    """Intraday quotes move, so an open market always refetches and stores nothing."""
+    payload = {'results': [{'strike_price': 95.0, 'expiration_date': '2030-01-18'}]}
+    session = _FakeSession(_FakeResponse(payload), _FakeResponse(payload))
+    monkeypatch.setattr(pod, '_SESSION', session)
+    monkeypatch.setattr(pod, 'rate_limiter', pod.RateLimiter(rps=1000))
+    monkeypatch.setattr(pod, 'get_market_status', lambda: 'open')
+
+    pod.get_options_chain('AAPL', 'put', 100.0, expiration='2030-01-18')
+    pod.get_options_chain('AAPL', 'put', 100.0, expiration='2030-01-18')
+    assert len(session.calls) == 2
+    assert not (tmp_path / 'cache').exists()
+
+
+def _make_contract(strike, bid, ask, last=0.0, delta=-0.3, days=30, oi=500, volume=200):
+    from datetime import date, timedelta
+    return {
+        'ticker': f'O:AAPL{int(strike)}P',
+        'strike_price': strike,
+        'expiration_date': (date.today() + timedelta(days=days)).isoformat(),
+        'last_quote': {'bid': bid, 'ask': ask, 'last': last},
+        'delta': delta,
+        'open_interest': oi,
+        'volume': volume,
+        'implied_volatility': 0.25,
+    }
+
+
+def test_blend_mid_price_fallbacks():
+    """Two-sided quotes use the midpoint; otherwise the last trade is blended in."""
+    import numpy as np
+    mid = pod.blend_mid_price(np.array([1.0, 1.0, 0.0, 0.0]),
+                              np.array([3.0, 0.0, 0.0, 0.0]),
+                              np.array([0.0, 2.0, 1.5, 0.0]))
+    assert mid.tolist() == [2.0, 1.5, 1.5, 0.0]
+
+
+def test_summarize_options_skips_and_scores(monkeypatch):
+    """Invalid or filtered contracts are skipped; survivors get vectorized metrics."""
+    captured = {}
+    monkeypatch.setattr(pod, 'filter_and_sort_options',
+                        lambda options, price, is_put, risk: captured.setdefault('options', options))
+    contracts = [
+        _make_contract(95.0, 1.9, 2.1),
+        _make_contract(90.0, 0.0, 0.0, last=0.0),  # no usable price
+        _make_contract(92.0, 1.0, 1.2, days=-3),   # expired
+        {'strike_price': 94.0},                    # no quote
+        _make_contract(93.0, 1.9, 2.1, oi=10),     # rejected by the OI filter
+        _make_contract(96.0, 1.9, 2.1, delta=-0.9),  # rejected by the delta band
+        _make_contract(91.0, 0.1, 0.2),            # rejected by the premium floor
+    ]
+    result = pod.summarize_options(contracts, 100.0, is_put=True, risk_tolerance='high')
+    assert [opt['strike_price'] for opt in result] == [95.0]
+    opt = result[0]
+    assert opt['mid_price'] == pytest.approx(2.0)
+    assert opt['premium_yield'] == pytest.approx(2.0 / 95.0 * 100)
+    assert opt['annualized_yield'] == pytest.approx(2.0 / 95.0 * 100 * 365 / 30)
+    assert opt['days_to_expiration'] == 30
+    assert opt['probability_itm'] == pytest.approx(30.0)
+    assert opt['spread_percent'] == pytest.approx(10.0)
+
+
+def test_option_metrics_kernel_matches_numpy_fallback():
+    """The (possibly JIT-compiled) metric kernel agrees with the NumPy implementation."""
+    import numpy as np
+    strike = np.array([95.0, 101.0, 0.0, 2.0])
+    mid = np.array([2.0, 3.5, 1.0, 4.0])
+    delta = np.array([-0.3, -0.55, 0.2, -0.9])
+    dte = np.array([30.0, 7.0, 1.0, 0.0])
+    for is_put in (True, False):
+        expected = pod._option_metrics_numpy(strike, mid, delta, dte, 100.0, is_put)
+        got = pod.option_metrics(strike, mid, delta, dte, 100.0, is_put)
+        for name, want in zip(pod.OPTION_METRIC_NAMES, expected):
+            np.testing.assert_allclose(got[name], want, err_msg=name)
+
+
+def test_calculate_premium_yield_single_contract():
+    """The per-contract helper reports the same formulas for one contract."""
+    contract = {'details': {'strike_price': 95.0, 'expiration_date': ''},
+                'day': {'bid': 1.9, 'ask': 2.1}, 'delta': -0.3}
+    metrics = pod.calculate_premium_yield(contract, 100.0, is_put=True)
+    assert metrics['mid_price'] == pytest.approx(2.0)
+    assert metrics['days_to_expiration'] == 30
+    assert metrics['break_even'] == pytest.approx(93.0)
+    assert metrics['risk_reward_ratio'] == pytest.approx(2.0 / 93.0)
+
+    # The scalar formulas agree with the chain-wide option_metrics
+    import numpy as np
+    for is_put, strike in ((True, 95.0), (False, 105.0)):
+        contract['details']['strike_price'] = strike
+        one = pod.calculate_premium_yield(contract, 100.0, is_put=is_put)
+        chain = pod.option_metrics(np.array([strike]), np.array([2.0]), np.array([-0.3]),
+                                   np.array([30]), 100.0, is_put)
+        for name in pod.OPTION_METRIC_NAMES:
+            assert one[name] == pytest.approx(float(chain[name][0])), name
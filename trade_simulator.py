@@ -6,6 +6,7 @@ for both backtesting and forward testing scenarios using Polygon.io data.
 """
 
 import math
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Union, Tuple
 import requests
@@ -242,7 +243,7 @@ def simulate_recommended_trades(trades: list, underlying_prices: dict, simulate_
     
     Args:
         trades: List of trade dictionaries, each containing at least:
-            - 'symbol': Ticker symbol
+            - 'symbol' or 'ticker': Underlying ticker symbol
             - 'option_type': 'put' or 'call'
             - 'strike_price': Option strike price
             - 'expiration': Expiration date (YYYY-MM-DD)
@@ -252,31 +253,28 @@ def simulate_recommended_trades(trades: list, underlying_prices: dict, simulate_
         simulate_forward: Whether to simulate forward or backtest
         
     Returns:
-        List of enhanced trade dictionaries with simulation results
+        The same list, with each trade dictionary annotated in place with a
+        'simulation' entry
     """
-    if not trades:
-        return []
-        
-    enhanced_trades = []
-    
     for trade in trades:
         try:
             # Skip if already has simulation data
             if 'simulation' in trade:
-                enhanced_trades.append(trade)
                 continue
+            
+            # Scanner output carries the underlying as 'ticker'
+            symbol = trade.get('symbol') or trade['ticker']
                 
             # Get current price if not provided
-            underlying_price = trade.get('underlying_price') or underlying_prices.get(trade['symbol'])
+            underlying_price = trade.get('underlying_price') or underlying_prices.get(symbol)
             if not underlying_price:
-                print(f"⚠️ Could not find price for {trade['symbol']}, skipping simulation")
+                print(f"⚠️ Could not find price for {symbol}, skipping simulation")
                 trade['simulation'] = {'error': 'Missing underlying price'}
-                enhanced_trades.append(trade)
                 continue
                 
             # Run simulation
             simulation = simulate_trade(
-                symbol=trade['symbol'],
+                symbol=symbol,
                 option_type=trade['option_type'],
                 strike_price=trade['strike_price'],
                 expiration=trade['expiration'],
@@ -289,17 +287,15 @@ def simulate_recommended_trades(trades: list, underlying_prices: dict, simulate_
             
             # Add simulation results to trade
             trade['simulation'] = simulation
-            enhanced_trades.append(trade)
             
             # Add small delay to avoid rate limiting
             time.sleep(0.1)
             
         except Exception as e:
-            print(f"⚠️ Error simulating trade for {trade.get('symbol', 'unknown')}: {str(e)}")
+            print(f"⚠️ Error simulating trade for {trade.get('symbol') or trade.get('ticker', 'unknown')}: {str(e)}")
             trade['simulation'] = {'error': str(e)}
-            enhanced_trades.append(trade)
     
-    return enhanced_trades
+    return trades
 
 # Example usage
 if __name__ == "__main__":